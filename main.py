@@ -8,10 +8,13 @@ AstrBot Git仓库推送插件
 - 多提供商同时监听
 - 支持 commits 和 releases 两种监听类型
 - 支持仓库级别和群组级别监听
+- 支持 Webhook 实时推送，轮询作为兜底
 """
 import asyncio
-from typing import Optional, Dict, List, Set
+import time
+from typing import Optional, Dict, List, Mapping, Set, Tuple, Union
 
+import aiohttp
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger, AstrBotConfig
@@ -26,44 +29,23 @@ if _current_dir not in sys.path:
     sys.path.insert(0, _current_dir)
 
 # 使用绝对导入
-from providers.base import (
+from providers import (
+    PROVIDER_MAP,
     BaseGitProvider,
     CommitInfo,
     ReleaseInfo,
     RepoInfo,
+    RateLimitError,
 )
-
-# 安全导入各 Provider（可能因依赖缺失而失败）
-try:
-    from providers.github import GitHubProvider
-except ImportError:
-    GitHubProvider = None  # type: ignore
-
-try:
-    from providers.gitlab import GitLabProvider
-except ImportError:
-    GitLabProvider = None  # type: ignore
-
-try:
-    from providers.cnb import CNBProvider
-except ImportError:
-    CNBProvider = None  # type: ignore
+from providers.base import _json_loads
 
 from utils.config import (
     PluginConfig, 
     RepoWatchConfig, 
     GroupWatchConfig,
 )
-from utils.storage import DataStorage, UpdateCache
-
-# 构建 PROVIDER_MAP
-PROVIDER_MAP = {}
-if GitHubProvider:
-    PROVIDER_MAP["github"] = GitHubProvider
-if GitLabProvider:
-    PROVIDER_MAP["gitlab"] = GitLabProvider
-if CNBProvider:
-    PROVIDER_MAP["cnb"] = CNBProvider
+from utils.storage import DataStorage, UpdateCache, ETagCache
+from utils.webhook import WebhookServer
 
 
 @register("astrbot_plugin_git_push", "YourName", "Git仓库推送插件", "1.0.0")
@@ -78,10 +60,27 @@ class GitPushPlugin(Star):
         self.storage: Optional[DataStorage] = None
         self.cache: Optional[UpdateCache] = None
         self.providers: Dict[str, BaseGitProvider] = {}
+        # 所有提供商共享的 HTTP 会话
+        self._session: Optional[aiohttp.ClientSession] = None
+        # 开启 http2 时使用的 httpx.AsyncClient
+        self._http_client = None
         self._check_task: Optional[asyncio.Task] = None
-        self._running = False
+        # 停止信号，设置后自动检查循环立即退出
+        self._stop_event = asyncio.Event()
+        # 保证提供商缓存文件按顺序写入
+        self._provider_cache_lock = asyncio.Lock()
         # 动态仓库列表（从群组展开）
-        self._expanded_repos: Dict[str, RepoWatchConfig] = {}
+        # 群组配置版本 -> 展开的仓库列表，群组配置变化后旧版本自然失效
+        self._expanded_repos: Dict[str, List[RepoWatchConfig]] = {}
+        # 全部监听仓库（直接监听 + 群组展开），展开结果变化时重建
+        self._all_repos_cache: List[RepoWatchConfig] = []
+        # 后台刷新中的群组: (provider, group) -> Task
+        self._refresh_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+        # Webhook 服务及已由 Webhook 覆盖的提供商
+        self._webhook_server: Optional[WebhookServer] = None
+        self._webhook_providers: Set[str] = set()
+        # 失败退避: (provider, repo) -> (连续失败次数, 下次可检查时间)
+        self._repo_failures: Dict[Tuple[str, str], Tuple[int, float]] = {}
 
     async def initialize(self):
         """初始化插件"""
@@ -95,102 +94,293 @@ class GitPushPlugin(Star):
         base_data_dir = os.path.join(os.getcwd(), "data", "plugins_data", "astrbot_plugin_git_push")
         os.makedirs(base_data_dir, exist_ok=True)
         self.storage = DataStorage(base_data_dir)
-        self.cache = UpdateCache(self.storage)
-        
+        # 在线程中回放缓存日志并读取提供商缓存，不阻塞事件循环
+        try:
+            self.cache, etags, branches = await asyncio.to_thread(self._load_storage)
+        except RuntimeError as e:
+            logger.error(f"加载缓存失败: {e}")
+            raise
+
         # 初始化提供商
-        await self._init_providers()
-        
+        await self._init_providers(etags, branches)
+
         # 展开群组配置
         await self._expand_group_configs()
         
+        # 启动 Webhook 服务
+        if self.config.webhook_enabled:
+            await self._start_webhook()
+        
         # 启动自动检查
         if self.config.auto_check:
             self._start_auto_check()
         
         logger.info(f"Git推送插件初始化完成")
         logger.info(f"已启用提供商: {list(self.providers.keys())}")
-        logger.info(f"监听仓库数: {len(self.config.watch_repos) + len(self._expanded_repos)}")
+        logger.info(f"监听仓库数: {len(self._get_all_repos())}")
+
+    def _load_storage(self) -> Tuple[UpdateCache, Dict[str, Dict], Dict[str, Dict]]:
+        """读取更新缓存、条件请求缓存和默认分支缓存（在线程中调用）"""
+        return UpdateCache(self.storage), self.storage.load_etags(), self.storage.load_default_branches()
 
-    async def _init_providers(self):
+    async def _init_providers(self, etags: Dict[str, Dict], branches: Dict[str, Dict]):
         """初始化提供商"""
         self.providers = {}
         
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=30,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75
+                )
+            )
+        
+        use_http2 = self.config.http2 or any(
+            config.enabled and config.http2 for config in self.config.providers.values()
+        )
+        if use_http2 and self._http_client is None:
+            self._http_client = self._create_http2_client()
+        
         provider_names = ["github", "gitlab", "cnb"]
         
         for name in provider_names:
             config = self.config.get_provider_config(name)
             if config and config.enabled:
-                provider_class = PROVIDER_MAP.get(name)
-                if provider_class is None:
-                    logger.warn(f"{name} 提供商模块加载失败，跳过")
-                    continue
-                
-                self.providers[name] = provider_class(
+                self.providers[name] = PROVIDER_MAP[name](
                     token=config.token,
-                    api_url=config.api_url
+                    api_url=config.api_url,
+                    session=self._session,
+                    http_client=self._http_client if self.config.http2 or config.http2 else None,
+                    concurrency=config.concurrency,
+                    max_per_second=config.max_per_second
                 )
-                await self.providers[name].init()
+                self.providers[name].etag_cache = ETagCache(etags.get(name))
+                self.providers[name].default_branch_cache = branches.get(name, {})
                 logger.info(f"{name} 提供商已初始化")
 
-    async def _expand_group_configs(self):
-        """展开群组配置为具体的仓库列表"""
+    def _create_http2_client(self):
+        """创建支持 HTTP/2 的 httpx 客户端，依赖缺失时返回 None 并回退到 aiohttp"""
+        try:
+            import httpx
+            return httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(30.0),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=30)
+            )
+        except ImportError:
+            logger.warn("未安装 httpx[http2]，HTTP/2 不可用，继续使用 aiohttp")
+            return None
+
+    async def _expand_group_configs(self, force_refresh: bool = False):
+        """
+        展开群组配置为具体的仓库列表
+        
+        配置未变化的群组沿用已展开的列表；其余群组优先使用缓存的仓库列表，
+        缓存过期（或 force_refresh）时在后台刷新，没有缓存的群组同步获取。
+        """
+        old_expanded = self._expanded_repos
         self._expanded_repos = {}
         
         for group_config in self.config.watch_groups:
             provider_name = group_config.provider.lower()
+            version = group_config.get_config_version()
+            
+            if not force_refresh and version in old_expanded:
+                self._expanded_repos[version] = old_expanded[version]
+                continue
             
             if provider_name not in self.providers:
                 logger.warn(f"群组 {group_config.group} 的提供商 {group_config.provider} 未启用")
                 continue
             
-            provider = self.providers[provider_name]
+            snapshot = self.cache.get_group_snapshot(group_config.provider, group_config.group)
+            # 快照已按包含/排除列表过滤，配置变化后不能沿用
+            if snapshot is None or snapshot.get("version") != version:
+                try:
+                    repos = await self._fetch_group_repos(group_config)
+                except Exception as e:
+                    logger.error(f"获取群组 {group_config.group} 仓库失败: {e}")
+                    continue
+            else:
+                repos = [RepoInfo(**repo) for repo in snapshot["repos"]]
+                if force_refresh or time.time() - snapshot["fetched_at"] >= self.config.group_ttl:
+                    self._schedule_group_refresh(group_config)
             
-            try:
-                repos = await provider.get_group_repos(group_config.group)
-                logger.info(f"从 {group_config.provider}/{group_config.group} 获取到 {len(repos)} 个仓库")
-                
-                for repo_info in repos:
-                    # 检查是否在包含/排除列表中
-                    if not group_config.should_watch_repo(repo_info.repo_name):
-                        continue
-                    
-                    # 创建仓库监听配置
-                    repo_config = RepoWatchConfig(
-                        provider=group_config.provider,
-                        repo=repo_info.name,
-                        branch=group_config.branch or repo_info.default_branch,
-                        watch_type=group_config.watch_type,
-                        note=group_config.note
-                    )
-                    
-                    # 使用缓存键作为唯一标识
-                    cache_key = repo_config.get_cache_key()
-                    self._expanded_repos[cache_key] = repo_config
-                
-                # 缓存群组仓库列表
-                self.cache.set_group_cached_repos(
-                    group_config.provider,
-                    group_config.group,
-                    {r.name for r in repos}
-                )
-                
-            except Exception as e:
-                logger.error(f"获取群组 {group_config.group} 仓库失败: {e}")
+            self._expanded_repos[version] = self._build_group_repo_configs(group_config, repos)
+        
+        self._rebuild_all_repos()
+        await self.cache.flush_async()
+
+    def _build_group_repo_configs(
+        self, group_config: GroupWatchConfig, repos: List[RepoInfo]
+    ) -> List[RepoWatchConfig]:
+        """根据群组仓库列表生成仓库监听配置"""
+        repo_configs = []
+        for repo_info in repos:
+            # 检查是否在包含/排除列表中
+            if not group_config.should_watch_repo(repo_info.repo_name):
+                continue
+            
+            # 创建仓库监听配置
+            repo_config = RepoWatchConfig(
+                provider=group_config.provider,
+                repo=repo_info.name,
+                branch=group_config.branch or repo_info.default_branch,
+                watch_type=group_config.watch_type,
+                note=group_config.note
+            )
+            
+            repo_configs.append(repo_config)
+        return repo_configs
+
+    def _get_expanded_repos(self) -> List[RepoWatchConfig]:
+        """获取群组展开的仓库（按缓存键去重）"""
+        repos: Dict[str, RepoWatchConfig] = {}
+        for repo_configs in self._expanded_repos.values():
+            for repo_config in repo_configs:
+                # 使用缓存键作为唯一标识
+                repos.setdefault(repo_config.get_cache_key(), repo_config)
+        return list(repos.values())
+
+    def _rebuild_all_repos(self):
+        """重建全部监听仓库列表"""
+        self._all_repos_cache = list(self.config.watch_repos) + self._get_expanded_repos()
+
+    def _get_all_repos(self) -> List[RepoWatchConfig]:
+        """获取全部监听仓库（直接监听 + 群组展开）"""
+        return self._all_repos_cache
+
+    async def _fetch_group_repos(self, group_config: GroupWatchConfig) -> List[RepoInfo]:
+        """从提供商获取群组仓库列表并更新缓存"""
+        provider = self.providers[group_config.provider.lower()]
+        # 快照与差异对比需要完整列表，这里收集异步生成器的全部结果
+        repos = [
+            repo async for repo in provider.get_group_repos(
+                group_config.group, filter_fn=group_config.should_watch_repo
+            )
+        ]
+        logger.info(f"从 {group_config.provider}/{group_config.group} 获取到 {len(repos)} 个仓库")
+        if not repos:
+            # 空列表多为请求失败，不覆盖已有缓存
+            return repos
+        
+        # 缓存群组仓库列表，并与上次的仓库列表对比
+        old_names = self.cache.get_group_cached_repos(group_config.provider, group_config.group)
+        self.cache.set_group_cached_repos(
+            group_config.provider,
+            group_config.group,
+            (r.name for r in repos)
+        )
+        if old_names:
+            new_names = self.cache.get_group_cached_repos(group_config.provider, group_config.group)
+            added = new_names - old_names
+            removed = old_names - new_names
+            if added:
+                logger.info(f"群组 {group_config.group} 新增仓库: {sorted(added)}")
+            if removed:
+                logger.info(f"群组 {group_config.group} 移除仓库: {sorted(removed)}")
+        
+        self.cache.set_group_snapshot(
+            group_config.provider,
+            group_config.group,
+            [
+                {"name": r.name, "repo_name": r.repo_name, "default_branch": r.default_branch}
+                for r in repos
+            ],
+            version=group_config.get_config_version()
+        )
+        return repos
+
+    def _schedule_group_refresh(self, group_config: GroupWatchConfig):
+        """在后台刷新群组仓库列表"""
+        key = (group_config.provider.lower(), group_config.group)
+        if key in self._refresh_tasks:
+            return
+        task = asyncio.create_task(self._refresh_group(group_config))
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+
+    def _refresh_stale_groups(self):
+        """群组仓库列表超过 group_ttl 时在后台刷新"""
+        now = time.time()
+        for group_config in self.config.watch_groups:
+            if group_config.get_config_version() not in self._expanded_repos:
+                continue
+            snapshot = self.cache.get_group_snapshot(group_config.provider, group_config.group)
+            if snapshot and now - snapshot["fetched_at"] >= self.config.group_ttl:
+                self._schedule_group_refresh(group_config)
+
+    async def _refresh_group(self, group_config: GroupWatchConfig):
+        """后台刷新群组，完成后替换该群组展开的仓库"""
+        try:
+            repos = await self._fetch_group_repos(group_config)
+        except Exception as e:
+            logger.error(f"刷新群组 {group_config.group} 仓库失败: {e}")
+            return
+        await self.cache.flush_async()
+        if not repos:
+            return
+        
+        version = group_config.get_config_version()
+        if version in self._expanded_repos:
+            self._expanded_repos[version] = self._build_group_repo_configs(group_config, repos)
+            self._rebuild_all_repos()
+
+    async def _start_webhook(self):
+        """启动 Webhook 服务"""
+        providers = set()
+        for name, provider in self.providers.items():
+            provider_config = self.config.get_provider_config(name)
+            if provider.SUPPORTS_WEBHOOK and provider_config.webhook_secret:
+                providers.add(name)
+            elif provider.SUPPORTS_WEBHOOK:
+                logger.warn(f"{name} 未配置 webhook_secret，继续使用轮询")
+        
+        server = WebhookServer(
+            self.config.webhook_host,
+            self.config.webhook_port,
+            self._handle_webhook
+        )
+        try:
+            await server.start()
+        except Exception as e:
+            logger.error(f"Webhook 服务启动失败: {e}")
+            return
+        
+        self._webhook_server = server
+        self._webhook_providers = providers
+        logger.info(
+            f"Webhook 服务已启动: {self.config.webhook_host}:{self.config.webhook_port}，"
+            f"接收提供商: {sorted(providers)}"
+        )
 
     def _start_auto_check(self):
         """启动自动检查"""
-        self._running = True
+        self._stop_event.clear()
         self._check_task = asyncio.create_task(self._auto_check_loop())
         logger.info(f"已启动自动检查，间隔: {self.config.check_interval}秒")
 
     async def _auto_check_loop(self):
         """自动检查循环"""
         interval = self.config.check_interval
-        while self._running:
+        last_full_check = time.monotonic()
+        while True:
             try:
-                await asyncio.sleep(interval)
-                if self._running:
-                    await self._check_and_push()
+                await asyncio.wait_for(self._stop_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                break
+            
+            try:
+                # Webhook 覆盖的提供商只做低频兜底检查
+                full_check = time.monotonic() - last_full_check >= self.config.webhook_fallback_interval
+                if full_check:
+                    last_full_check = time.monotonic()
+                self._refresh_stale_groups()
+                await self._check_and_push(skip_webhook=not full_check)
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -198,24 +388,49 @@ class GitPushPlugin(Star):
 
     async def terminate(self):
         """销毁插件"""
-        self._running = False
+        self._stop_event.set()
         if self._check_task:
-            self._check_task.cancel()
+            try:
+                # 等待进行中的检查结束，超时则取消
+                await asyncio.wait_for(self._check_task, timeout=5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._check_task = None
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+        if self._webhook_server:
+            await self._webhook_server.stop()
+        if self.cache:
+            await self.cache.close()
+        if self.storage:
+            await self._save_provider_caches()
         for provider in self.providers.values():
             await provider.close()
+        if self._session:
+            await self._session.close()
+            self._session = None
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
         logger.info("Git推送插件已卸载")
 
-    async def _check_and_push(self, silent: bool = False) -> int:
-        """检查并推送更新"""
-        all_repos = list(self.config.watch_repos) + list(self._expanded_repos.values())
+    async def _check_and_push(self, silent: bool = False, skip_webhook: bool = False) -> int:
+        """
+        检查并推送更新
+        
+        Args:
+            silent: 未配置仓库时不输出警告
+            skip_webhook: 跳过已由 Webhook 覆盖的提供商
+        """
+        all_repos = self._get_all_repos()
         
         if not all_repos:
             if not silent:
                 logger.warn("未配置监听仓库")
             return 0
 
-        update_count = 0
-        all_updates = []
+        now = time.monotonic()
+        pending = []
 
         for repo_config in all_repos:
             provider_name = repo_config.provider.lower()
@@ -223,56 +438,137 @@ class GitPushPlugin(Star):
             if provider_name not in self.providers:
                 continue
             
-            provider = self.providers[provider_name]
+            if skip_webhook and provider_name in self._webhook_providers:
+                continue
             
-            try:
-                if repo_config.watch_type == "commits":
-                    update_info = await self._check_commits(provider, repo_config)
-                else:
-                    update_info = await self._check_release(provider, repo_config)
-                
-                if update_info:
-                    all_updates.append({
-                        "info": update_info,
-                        "note": repo_config.note
-                    })
-                    update_count += 1
-            except Exception as e:
-                logger.error(f"检查 {repo_config.provider}/{repo_config.repo} 失败: {e}")
+            # 处于失败退避期的仓库跳过本轮
+            failure = self._repo_failures.get((provider_name, repo_config.repo))
+            if failure and now < failure[1]:
+                continue
+            
+            pending.append(repo_config)
+
+        # 并发检查，信号量限制同时进行的请求数
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        tasks = [
+            asyncio.create_task(self._check_one(repo_config, semaphore))
+            for repo_config in pending
+        ]
+        # 本轮检查的时间预算，超时的仓库取消并进入退避，保证下一轮按时开始
+        budget = self.config.check_interval * 0.8
+        timed_out = set()
+        if tasks:
+            _, timed_out = await asyncio.wait(tasks, timeout=budget)
+            for task in timed_out:
+                task.cancel()
+            await asyncio.gather(*timed_out, return_exceptions=True)
 
-        # 推送消息
-        for update in all_updates:
-            message = update["info"].to_push_message()
-            if update["note"]:
-                message += f"\n📌 备注: {update['note']}"
-            await self._send_push(message)
+        all_updates = []
+        for repo_config, task in zip(pending, tasks):
+            failure_key = (repo_config.provider.lower(), repo_config.repo)
+            if task in timed_out:
+                self._record_failure(failure_key)
+                logger.warn(f"检查 {repo_config.provider}/{repo_config.repo} 超出本轮时间预算 {budget:.0f} 秒，已取消")
+                continue
+            error = task.exception()
+            if isinstance(error, RateLimitError):
+                self._record_failure(failure_key, error.retry_after)
+                logger.warn(f"检查 {repo_config.provider}/{repo_config.repo} 受限: {error}")
+                continue
+            if error:
+                self._record_failure(failure_key)
+                logger.error(f"检查 {repo_config.provider}/{repo_config.repo} 失败: {error}")
+                continue
+            self._repo_failures.pop(failure_key, None)
+            result = task.result()
+            if result:
+                all_updates.append((result, repo_config.note))
+
+        await self._push_updates(all_updates)
+        await self.cache.flush_async()
+        await self._save_provider_caches()
+        return len(all_updates)
+
+    async def _save_provider_caches(self):
+        """
+        持久化各提供商的条件请求缓存和默认分支缓存（仅在有修改时写入）
+        
+        在事件循环中编码，文件写入在线程中进行，不阻塞事件循环。
+        """
+        async with self._provider_cache_lock:
+            files = []
+            if any(p.default_branch_dirty for p in self.providers.values()):
+                files.append((self.storage.branch_file, self.storage.encode_json({
+                    name: provider.default_branch_cache
+                    for name, provider in self.providers.items()
+                })))
+                for provider in self.providers.values():
+                    provider.default_branch_dirty = False
+            
+            caches = {
+                name: provider.etag_cache
+                for name, provider in self.providers.items()
+                if provider.etag_cache is not None
+            }
+            if any(cache.dirty for cache in caches.values()):
+                files.append((self.storage.etag_file, self.storage.encode_json(
+                    {name: cache.to_dict() for name, cache in caches.items()}
+                )))
+                for cache in caches.values():
+                    cache.dirty = False
+            
+            if files:
+                await asyncio.to_thread(self.storage.write_files, files)
+
+    async def _check_one(
+        self, repo_config: RepoWatchConfig, semaphore: asyncio.Semaphore
+    ) -> Optional[Union[CommitInfo, ReleaseInfo]]:
+        """检查单个仓库"""
+        provider = self.providers[repo_config.provider.lower()]
+        async with semaphore:
+            if repo_config.watch_type == "commits":
+                return await self._check_commits(provider, repo_config)
+            return await self._check_release(provider, repo_config)
+
+    def _record_failure(self, failure_key: Tuple[str, str], min_delay: float = 0):
+        """记录检查失败，按指数退避推迟下次检查（不早于 min_delay 秒）"""
+        failures = self._repo_failures.get(failure_key, (0, 0.0))[0] + 1
+        delay = max(
+            min_delay,
+            min(self.config.backoff_base * 2 ** (failures - 1), self.config.backoff_max)
+        )
+        self._repo_failures[failure_key] = (failures, time.monotonic() + delay)
 
-        return update_count
+    async def _push_updates(self, updates: List[Tuple[Union[CommitInfo, ReleaseInfo], str]]):
+        """推送更新消息，相同的更新只推送一次"""
+        seen = set()
+        for info, note in updates:
+            if (info, note) in seen:
+                continue
+            seen.add((info, note))
+            message = info.to_push_message()
+            if note:
+                message += f"\n📌 备注: {note}"
+            await self._send_push(message)
 
     async def _check_commits(self, provider: BaseGitProvider, repo_config: RepoWatchConfig) -> Optional[CommitInfo]:
         """检查提交更新"""
-        repo = repo_config.repo
-        branch = repo_config.branch
-        
-        commit = await provider.get_latest_commit(repo, branch)
+        commit = await provider.get_latest_commit(repo_config.repo, repo_config.branch)
         if not commit:
             return None
+        return self._accept_commit(repo_config, commit)
+
+    def _accept_commit(self, repo_config: RepoWatchConfig, commit: CommitInfo) -> Optional[CommitInfo]:
+        """对比缓存，返回需要推送的提交"""
+        repo = repo_config.repo
         
-        cached_sha = self.cache.get_cached_commit_sha(
-            repo_config.provider, repo, commit.branch
-        )
-        
-        is_first = self.cache.is_first_commit_check(
-            repo_config.provider, repo, commit.branch
+        cached_sha, is_first = self.cache.cas_commit_sha(
+            repo_config.provider, repo, commit.branch, commit.sha
         )
         
         if commit.sha == cached_sha:
             return None
         
-        self.cache.set_cached_commit_sha(
-            repo_config.provider, repo, commit.branch, commit.sha
-        )
-        
         if is_first and not self.config.first_push:
             logger.info(f"首次检测到 {repo_config.provider}/{repo}，跳过推送")
             return None
@@ -282,20 +578,22 @@ class GitPushPlugin(Star):
 
     async def _check_release(self, provider: BaseGitProvider, repo_config: RepoWatchConfig) -> Optional[ReleaseInfo]:
         """检查发布更新"""
-        repo = repo_config.repo
-        
-        release = await provider.get_latest_release(repo)
+        release = await provider.get_latest_release(repo_config.repo)
         if not release:
             return None
+        return self._accept_release(repo_config, release)
+
+    def _accept_release(self, repo_config: RepoWatchConfig, release: ReleaseInfo) -> Optional[ReleaseInfo]:
+        """对比缓存，返回需要推送的发布"""
+        repo = repo_config.repo
         
-        cached_tag = self.cache.get_cached_release_tag(repo_config.provider, repo)
-        is_first = self.cache.is_first_release_check(repo_config.provider, repo)
+        cached_tag, is_first = self.cache.cas_release_tag(
+            repo_config.provider, repo, release.tag
+        )
         
         if release.tag == cached_tag:
             return None
         
-        self.cache.set_cached_release_tag(repo_config.provider, repo, release.tag)
-        
         if is_first and not self.config.first_push:
             logger.info(f"首次检测到 {repo_config.provider}/{repo} release，跳过推送")
             return None
@@ -303,31 +601,92 @@ class GitPushPlugin(Star):
         logger.info(f"检测到新版本: {repo_config.provider}/{repo} - {release.tag}")
         return release
 
-    async def _send_push(self, message: str):
-        """发送推送消息"""
-        groups, users = self.config.get_all_push_targets()
+    async def _handle_webhook(self, provider_name: str, headers: Mapping[str, str], body: bytes) -> int:
+        """处理 Webhook 请求，返回 HTTP 状态码"""
+        if provider_name not in self._webhook_providers:
+            return 404
+        
+        provider = self.providers[provider_name]
+        secret = self.config.get_provider_config(provider_name).webhook_secret
+        if not provider.verify_webhook(headers, body, secret):
+            logger.warn(f"{provider_name} Webhook 签名校验失败")
+            return 401
         
-        for group_id in groups:
+        try:
+            payload = _json_loads(body)
+        except ValueError:
+            return 400
+        if not isinstance(payload, dict):
+            return 400
+        
+        updates = []
+        for info in provider.parse_webhook(headers, payload):
             try:
-                await self.context.send_message(
-                    message,
-                    target_type="group",
-                    target_id=str(group_id)
-                )
-                logger.info(f"已推送到群: {group_id}")
+                repo_config = await self._match_webhook_repo(provider_name, provider, info)
             except Exception as e:
-                logger.error(f"推送到群 {group_id} 失败: {e}")
+                logger.error(f"匹配 Webhook 仓库 {provider_name}/{info.repo} 失败: {e}")
+                continue
+            if not repo_config:
+                continue
+            
+            if isinstance(info, CommitInfo):
+                update_info = self._accept_commit(repo_config, info)
+            else:
+                update_info = self._accept_release(repo_config, info)
+            if update_info:
+                updates.append((update_info, repo_config.note))
+        
+        await self._push_updates(updates)
+        await self.cache.flush_async()
+        return 200
+
+    async def _match_webhook_repo(
+        self,
+        provider_name: str,
+        provider: BaseGitProvider,
+        info: Union[CommitInfo, ReleaseInfo]
+    ) -> Optional[RepoWatchConfig]:
+        """查找与 Webhook 事件匹配的监听配置"""
+        watch_type = "commits" if isinstance(info, CommitInfo) else "releases"
+        for repo_config in self._get_all_repos():
+            if repo_config.provider.lower() != provider_name:
+                continue
+            if repo_config.repo.lower() != info.repo.lower() or repo_config.watch_type != watch_type:
+                continue
+            if watch_type == "commits":
+                # 未指定分支时只接收默认分支的推送
+                branch = repo_config.branch or await provider.get_default_branch(repo_config.repo)
+                if branch != info.branch:
+                    continue
+            return repo_config
+        return None
 
-        for user_id in users:
-            try:
-                await self.context.send_message(
-                    message,
-                    target_type="private",
-                    target_id=str(user_id)
-                )
-                logger.info(f"已推送到用户: {user_id}")
-            except Exception as e:
-                logger.error(f"推送到用户 {user_id} 失败: {e}")
+    async def _send_push(self, message: str):
+        """发送推送消息"""
+        groups, users = self.config.get_all_push_targets()
+        
+        sends = [
+            self._send_to_target(message, "group", str(group_id))
+            for group_id in groups
+        ]
+        sends += [
+            self._send_to_target(message, "private", str(user_id))
+            for user_id in users
+        ]
+        await asyncio.gather(*sends)
+
+    async def _send_to_target(self, message: str, target_type: str, target_id: str):
+        """发送消息到单个目标"""
+        target_name = "群" if target_type == "group" else "用户"
+        try:
+            await self.context.send_message(
+                message,
+                target_type=target_type,
+                target_id=target_id
+            )
+            logger.info(f"已推送到{target_name}: {target_id}")
+        except Exception as e:
+            logger.error(f"推送到{target_name} {target_id} 失败: {e}")
 
     # ============ 指令部分 ============
 
@@ -398,28 +757,36 @@ class GitPushPlugin(Star):
     @filter.command("git_push_status")
     async def show_status(self, event: AstrMessageEvent):
         """查看当前状态"""
-        text = "📊 Git推送插件状态\n\n"
+        lines = ["📊 Git推送插件状态", ""]
         
-        text += f"🔄 自动检查: {'✅ 开启' if self.config.auto_check else '❌ 关闭'}\n"
+        lines.append(f"🔄 自动检查: {'✅ 开启' if self.config.auto_check else '❌ 关闭'}")
         if self.config.auto_check:
-            text += f"   间隔: {self.config.check_interval} 秒\n"
+            lines.append(f"   间隔: {self.config.check_interval} 秒")
+        
+        lines.append(f"🔔 首次推送: {'✅ 开启' if self.config.first_push else '❌ 关闭'}")
         
-        text += f"🔔 首次推送: {'✅ 开启' if self.config.first_push else '❌ 关闭'}\n\n"
+        if self._webhook_server:
+            webhook_providers = ", ".join(sorted(self._webhook_providers)) or "无"
+            lines.append(f"🪝 Webhook: ✅ 端口 {self.config.webhook_port} ({webhook_providers})")
+        else:
+            lines.append("🪝 Webhook: ❌ 关闭")
+        lines.append("")
         
         groups, users = self.config.get_all_push_targets()
-        text += f"📢 推送群聊: {len(groups)} 个\n"
-        text += f"📢 推送用户: {len(users)} 个\n\n"
+        lines.append(f"📢 推送群聊: {len(groups)} 个")
+        lines.append(f"📢 推送用户: {len(users)} 个")
+        lines.append("")
         
-        text += f"📦 直接监听仓库: {len(self.config.watch_repos)} 个\n"
-        text += f"📂 监听群组: {len(self.config.watch_groups)} 个\n"
-        text += f"📦 群组展开仓库: {len(self._expanded_repos)} 个\n"
+        lines.append(f"📦 直接监听仓库: {len(self.config.watch_repos)} 个")
+        lines.append(f"📂 监听群组: {len(self.config.watch_groups)} 个")
+        lines.append(f"📦 群组展开仓库: {len(self._get_expanded_repos())} 个")
         
-        yield event.plain_result(text)
+        yield event.plain_result("\n".join(lines))
 
     @filter.command("git_push_providers")
     async def show_providers(self, event: AstrMessageEvent):
         """查看提供商状态"""
-        text = "🔌 提供商状态\n\n"
+        lines = ["🔌 提供商状态", ""]
         
         providers_status = {
             "github": ("GitHub", self.config.get_provider_config("github")),
@@ -431,59 +798,60 @@ class GitPushPlugin(Star):
             if config and config.enabled:
                 token_status = "✅ 已配置" if config.token else "⚠️ 未配置"
                 url_info = f" ({config.api_url})" if config.api_url else ""
-                text += f"✅ {display_name}{url_info}\n"
-                text += f"   令牌: {token_status}\n"
+                lines.append(f"✅ {display_name}{url_info}")
+                lines.append(f"   令牌: {token_status}")
             else:
-                text += f"❌ {display_name}\n"
-                text += f"   状态: 未启用\n"
-            text += "\n"
+                lines.append(f"❌ {display_name}")
+                lines.append("   状态: 未启用")
+            lines.append("")
         
-        yield event.plain_result(text)
+        yield event.plain_result("\n".join(lines))
 
     @filter.command("git_push_list")
     async def list_repos(self, event: AstrMessageEvent):
         """列出监听的仓库和群组"""
-        text = "📋 监听配置列表\n\n"
+        if not self.config.watch_repos and not self.config.watch_groups:
+            yield event.plain_result("📋 当前没有监听任何仓库或群组")
+            return
+        
+        lines = ["📋 监听配置列表", ""]
         
         # 仓库列表
         if self.config.watch_repos:
-            text += "🔹 直接监听仓库:\n"
+            lines.append("🔹 直接监听仓库:")
             for i, repo in enumerate(self.config.watch_repos, 1):
                 status = "✅" if repo.provider.lower() in self.providers else "❌"
-                text += f"  {status} [{i}] {repo.provider}/{repo.repo}\n"
-                text += f"       类型: {repo.watch_type}"
+                lines.append(f"  {status} [{i}] {repo.provider}/{repo.repo}")
+                detail = f"       类型: {repo.watch_type}"
                 if repo.branch:
-                    text += f" | 分支: {repo.branch}"
-                text += "\n"
-            text += "\n"
+                    detail += f" | 分支: {repo.branch}"
+                lines.append(detail)
+            lines.append("")
         
         # 群组列表
         if self.config.watch_groups:
-            text += "🔹 监听群组:\n"
+            lines.append("🔹 监听群组:")
             for i, group in enumerate(self.config.watch_groups, 1):
                 status = "✅" if group.provider.lower() in self.providers else "❌"
-                text += f"  {status} [{i}] {group.provider}/{group.group}\n"
-                text += f"       类型: {group.watch_type}"
+                lines.append(f"  {status} [{i}] {group.provider}/{group.group}")
+                detail = f"       类型: {group.watch_type}"
                 if group.include_repos:
-                    text += f" | 包含: {len(group.include_repos)}"
+                    detail += f" | 包含: {len(group.include_repos)}"
                 if group.exclude_repos:
-                    text += f" | 排除: {len(group.exclude_repos)}"
-                text += "\n"
-            text += "\n"
+                    detail += f" | 排除: {len(group.exclude_repos)}"
+                lines.append(detail)
+            lines.append("")
         
         # 展开的仓库
-        if self._expanded_repos:
-            text += f"🔹 群组展开仓库 ({len(self._expanded_repos)} 个):\n"
-            for i, (key, repo) in enumerate(self._expanded_repos.items(), 1):
-                if i > 10:
-                    text += f"  ... 还有 {len(self._expanded_repos) - 10} 个\n"
-                    break
-                text += f"  [{i}] {repo.provider}/{repo.repo}\n"
-        
-        if not self.config.watch_repos and not self.config.watch_groups:
-            text = "📋 当前没有监听任何仓库或群组"
+        expanded_repos = self._get_expanded_repos()
+        if expanded_repos:
+            lines.append(f"🔹 群组展开仓库 ({len(expanded_repos)} 个):")
+            for i, repo in enumerate(expanded_repos[:10], 1):
+                lines.append(f"  [{i}] {repo.provider}/{repo.repo}")
+            if len(expanded_repos) > 10:
+                lines.append(f"  ... 还有 {len(expanded_repos) - 10} 个")
         
-        yield event.plain_result(text)
+        yield event.plain_result("\n".join(lines))
 
     @filter.command("git_push_refresh")
     async def refresh_groups(self, event: AstrMessageEvent):
@@ -491,8 +859,13 @@ class GitPushPlugin(Star):
         yield event.plain_result("正在刷新群组仓库列表...")
         
         try:
-            await self._expand_group_configs()
-            yield event.plain_result(f"✅ 刷新完成，共展开 {len(self._expanded_repos)} 个仓库")
+            await self._expand_group_configs(force_refresh=True)
+            if self._refresh_tasks:
+                yield event.plain_result(
+                    f"✅ 当前展开 {len(self._get_expanded_repos())} 个仓库，群组列表正在后台刷新"
+                )
+            else:
+                yield event.plain_result(f"✅ 刷新完成，共展开 {len(self._get_expanded_repos())} 个仓库")
         except Exception as e:
             logger.error(f"刷新群组失败: {e}")
             yield event.plain_result(f"❌ 刷新失败: {e}")
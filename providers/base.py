@@ -1,16 +1,62 @@
 """
 Git 服务提供商基类
 """
+import asyncio
+import functools
+import re
+import time
+import urllib.parse
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from typing import (
+    Optional, AsyncIterator, Callable, Dict, Any, List, Mapping, Tuple, Union, TYPE_CHECKING
+)
 from datetime import datetime
 
 if TYPE_CHECKING:
     import aiohttp
 
+# 优先使用 orjson 解析响应，未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
 
-@dataclass
+# 匹配 Link 响应头中 rel="last" 的页码
+_LINK_LAST_PAGE_RE = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_datetime(date_str: str) -> str:
+    """将 ISO 格式时间转换为展示格式（结果缓存，轮询中同一时间会被反复解析）"""
+    if not date_str:
+        return "未知"
+    try:
+        # 处理 ISO 格式
+        if "T" in date_str:
+            date_str = date_str.replace("Z", "+00:00")
+            dt = datetime.fromisoformat(date_str)
+            return dt.strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        pass
+    return date_str
+
+
+class ProviderError(Exception):
+    """提供商请求失败（网络错误或非预期的响应状态）"""
+
+
+class RateLimitError(ProviderError):
+    """提供商 API 限流"""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(slots=True, frozen=True)
 class CommitInfo:
     """提交信息"""
     sha: str
@@ -24,18 +70,20 @@ class CommitInfo:
 
     def to_push_message(self) -> str:
         """转换为推送消息"""
-        text = f"📦 【{self.provider}】{self.repo}\n"
-        text += f"🌿 分支: {self.branch}\n"
-        text += f"📝 提交: {self.sha[:7]}\n"
-        text += f"👤 作者: {self.author}\n"
-        text += f"⏰ 时间: {self.date}\n"
-        text += f"💬 信息: {self.message}"
+        lines = [
+            f"📦 【{self.provider}】{self.repo}",
+            f"🌿 分支: {self.branch}",
+            f"📝 提交: {self.sha[:7]}",
+            f"👤 作者: {self.author}",
+            f"⏰ 时间: {self.date}",
+            f"💬 信息: {self.message}",
+        ]
         if self.url:
-            text += f"\n🔗 链接: {self.url}"
-        return text
+            lines.append(f"🔗 链接: {self.url}")
+        return "\n".join(lines)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ReleaseInfo:
     """发布信息"""
     tag: str
@@ -49,20 +97,19 @@ class ReleaseInfo:
 
     def to_push_message(self) -> str:
         """转换为推送消息"""
-        text = f"🚀 【{self.provider}】{self.repo}\n"
-        text += f"🏷️ 版本: {self.tag}\n"
+        lines = [f"🚀 【{self.provider}】{self.repo}", f"🏷️ 版本: {self.tag}"]
         if self.name and self.name != self.tag:
-            text += f"📋 名称: {self.name}\n"
+            lines.append(f"📋 名称: {self.name}")
         if self.author:
-            text += f"👤 发布者: {self.author}\n"
-        text += f"⏰ 时间: {self.date}\n"
-        text += f"📄 说明: {self.body[:200]}"
+            lines.append(f"👤 发布者: {self.author}")
+        lines.append(f"⏰ 时间: {self.date}")
+        lines.append(f"📄 说明: {self.body[:200]}")
         if self.url:
-            text += f"\n🔗 链接: {self.url}"
-        return text
+            lines.append(f"🔗 链接: {self.url}")
+        return "\n".join(lines)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RepoInfo:
     """仓库基本信息"""
     name: str  # 仓库名 (owner/repo 格式)
@@ -75,10 +122,49 @@ class RepoInfo:
 class BaseGitProvider(ABC):
     """Git 服务提供商基类"""
 
-    def __init__(self, token: str = "", **kwargs):
+    # 是否支持 Webhook 推送
+    SUPPORTS_WEBHOOK = False
+    # 单次请求超时（秒）
+    REQUEST_TIMEOUT = 20
+    # 默认同时进行的请求数上限
+    DEFAULT_CONCURRENCY = 4
+    # 缓存条目只有 Last-Modified 时，是否先用 HEAD 请求探测资源是否变化
+    HEAD_PROBE = True
+    # 默认分支缓存有效期（秒）
+    DEFAULT_BRANCH_TTL = 86400
+
+    def __init__(
+        self,
+        token: str = "",
+        session: Optional["aiohttp.ClientSession"] = None,
+        http_client: Optional[Any] = None,
+        concurrency: int = 0,
+        max_per_second: float = 0,
+        **kwargs
+    ):
         self.token = token
-        self.session: Optional[Any] = None  # aiohttp.ClientSession
+        # 由插件统一创建并管理生命周期的共享会话
+        self.session = session
+        # 未注入会话时由提供商自行创建，关闭时只关闭自己创建的会话
+        self._owns_session = False
+        # 可选的 httpx.AsyncClient（HTTP/2），设置后优先使用
+        self.http_client = http_client
         self.config = kwargs
+        # 条件请求缓存（utils.storage.ETagCache），未设置时不发送条件请求
+        self.etag_cache: Optional[Any] = None
+        # 默认分支缓存: 仓库名 -> [分支名, 获取时间 (time.time)]
+        self.default_branch_cache: Dict[str, List[Any]] = {}
+        self.default_branch_dirty = False
+        # 触发限流后的冷却截止时间 (time.monotonic)
+        self._cooldown_until = 0.0
+        # 进行中的请求: 请求键 -> Task，相同请求只发出一次
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+        # 同时进行的请求数上限
+        self._sem = asyncio.Semaphore(concurrency or self.DEFAULT_CONCURRENCY)
+        # 每秒请求数上限（令牌桶），0 表示不限制
+        self.max_per_second = max_per_second
+        self._tokens = float(max_per_second)
+        self._tokens_at = time.monotonic()
 
     @property
     @abstractmethod
@@ -92,18 +178,6 @@ class BaseGitProvider(ABC):
         """API 基础地址"""
         pass
 
-    async def init(self):
-        """初始化会话"""
-        if not self.session:
-            import aiohttp
-            self.session = aiohttp.ClientSession()
-
-    async def close(self):
-        """关闭会话"""
-        if self.session:
-            await self.session.close()
-            self.session = None
-
     def get_headers(self) -> Dict[str, str]:
         """获取请求头"""
         headers = {
@@ -114,10 +188,9 @@ class BaseGitProvider(ABC):
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
 
-    @abstractmethod
     async def get_default_branch(self, repo: str) -> str:
         """
-        获取默认分支
+        获取默认分支，结果缓存 DEFAULT_BRANCH_TTL 秒
         
         Args:
             repo: 仓库名 (owner/repo)
@@ -125,6 +198,32 @@ class BaseGitProvider(ABC):
         Returns:
             默认分支名
         """
+        cached = self.default_branch_cache.get(repo)
+        if cached and time.time() - cached[1] < self.DEFAULT_BRANCH_TTL:
+            return cached[0]
+        branch = await self._fetch_default_branch(repo)
+        if not branch:
+            return cached[0] if cached else "main"
+        self.default_branch_cache[repo] = [branch, time.time()]
+        self.default_branch_dirty = True
+        return branch
+
+    def invalidate_default_branch(self, repo: str):
+        """清除仓库的默认分支缓存，用于分支失效时重新获取"""
+        if self.default_branch_cache.pop(repo, None) is not None:
+            self.default_branch_dirty = True
+
+    @abstractmethod
+    async def _fetch_default_branch(self, repo: str) -> Optional[str]:
+        """
+        从 API 获取默认分支
+        
+        Args:
+            repo: 仓库名 (owner/repo)
+        
+        Returns:
+            默认分支名，获取失败返回 None
+        """
         pass
 
     @abstractmethod
@@ -154,93 +253,328 @@ class BaseGitProvider(ABC):
         """
         pass
 
-    async def get_group_repos(self, group: str) -> List[RepoInfo]:
+    async def get_group_repos(
+        self, group: str, filter_fn: Optional[Callable[[str], bool]] = None
+    ) -> AsyncIterator[RepoInfo]:
         """
-        获取群组/组织下的所有仓库
+        逐个产出群组/组织下的仓库（异步生成器）
         
         Args:
             group: 组织名/群组名
+            filter_fn: 按仓库短名过滤，返回 False 的仓库不会生成 RepoInfo
+        
+        Yields:
+            仓库信息
+        """
+        # 默认实现不产出任何仓库，子类可重写
+        return
+        yield
+
+    def verify_webhook(self, headers: Mapping[str, str], body: bytes, secret: str) -> bool:
+        """
+        校验 Webhook 请求签名
+        
+        Args:
+            headers: 请求头
+            body: 原始请求体
+            secret: 配置的 Webhook 密钥
         
         Returns:
-            仓库列表
+            校验是否通过
+        """
+        return False
+
+    def parse_webhook(
+        self, headers: Mapping[str, str], payload: Dict
+    ) -> List[Union[CommitInfo, ReleaseInfo]]:
+        """
+        将 Webhook 事件转换为提交/发布信息
+        
+        Args:
+            headers: 请求头
+            payload: 解析后的请求体
+        
+        Returns:
+            更新信息列表，无关事件返回空列表
         """
-        # 默认实现返回空列表，子类可重写
         return []
 
+    @staticmethod
+    def _first_line(text: str, maxlen: Optional[int] = None) -> str:
+        """取文本第一行，可限制最大长度"""
+        head = text.partition("\n")[0]
+        return head[:maxlen] if maxlen else head
+
     def _parse_datetime(self, date_str: str) -> str:
         """解析日期时间"""
-        if not date_str:
-            return "未知"
-        try:
-            # 处理 ISO 格式
-            if "T" in date_str:
-                date_str = date_str.replace("Z", "+00:00")
-                dt = datetime.fromisoformat(date_str)
-                return dt.strftime("%Y-%m-%d %H:%M")
-        except:
-            pass
-        return date_str
+        return _format_datetime(date_str)
+
+    @staticmethod
+    def _request_key(url: str, params: Dict = None) -> str:
+        """生成请求缓存键（URL + 排序后的查询参数）"""
+        if not params:
+            return url
+        return f"{url}?{urllib.parse.urlencode(sorted(params.items()))}"
+
+    def _check_cooldown(self):
+        """限流冷却期内直接抛出 RateLimitError，不再发出请求"""
+        remaining = self._cooldown_until - time.monotonic()
+        if remaining > 0:
+            raise RateLimitError(f"{self.name} API 限流中，{int(remaining)} 秒后重试", remaining)
+
+    def _update_rate_limit(self, status: int, headers: Mapping[str, str]):
+        """根据 Retry-After / X-RateLimit-* 响应头设置冷却时间"""
+        retry_after = 0.0
+        if status in (403, 429) and headers.get("Retry-After", "").isdigit():
+            retry_after = float(headers["Retry-After"])
+        else:
+            remaining = headers.get("X-RateLimit-Remaining", headers.get("RateLimit-Remaining", ""))
+            reset = headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset", ""))
+            if remaining == "0" and reset.isdigit():
+                # 重置时间为 Unix 时间戳
+                retry_after = max(0.0, float(reset) - time.time())
+            elif status == 429:
+                retry_after = 60.0
+        if retry_after > 0:
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + retry_after)
 
     async def _fetch_json(self, url: str, params: Dict = None) -> Optional[Any]:
-        """获取 JSON 数据"""
-        if not self.session:
-            await self.init()
+        """
+        获取 JSON 数据，相同的并发请求合并为一次
+        
+        Returns:
+            解析后的数据，资源不存在返回 None
+        
+        Raises:
+            RateLimitError: 触发限流或处于冷却期
+            ProviderError: 网络错误或其他非预期状态
+        """
+        key = self._request_key(url, params)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_json(url, params, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_request_done(key, t))
+        # shield: 单个调用方被取消时不影响其他等待同一请求的调用方
+        return await asyncio.shield(task)
+
+    def _on_request_done(self, key: str, task: "asyncio.Task"):
+        """请求结束后移出进行中列表"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # 标记异常已读取，避免所有调用方都已取消时输出告警
+            task.exception()
+
+    async def _get(
+        self, url: str, params: Optional[Dict], headers: Dict[str, str], method: str = "GET"
+    ) -> Tuple[int, Mapping[str, str], bytes]:
+        """发出请求（默认 GET），返回 (状态码, 响应头, 响应体)"""
+        async with self._sem:
+            await self._throttle()
+            return await self._send(method, url, params, headers)
+
+    async def _throttle(self):
+        """按令牌桶限制请求速率，令牌不足时等待"""
+        rate = self.max_per_second
+        if rate <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(rate, self._tokens + (now - self._tokens_at) * rate)
+        self._tokens_at = now
+        # 先预占令牌，欠下的部分按速率等待补足
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / rate)
+
+    async def _send(
+        self, method: str, url: str, params: Optional[Dict], headers: Dict[str, str]
+    ) -> Tuple[int, Mapping[str, str], bytes]:
+        """实际发送请求"""
+        if self.http_client is not None:
+            resp = await self.http_client.request(
+                method, url, params=params, headers=headers, timeout=self.REQUEST_TIMEOUT
+            )
+            return resp.status_code, resp.headers, resp.content
         
         import aiohttp
+        session = await self._get_session()
+        async with session.request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT)
+        ) as resp:
+            return resp.status, resp.headers, await resp.read()
+
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        """获取 HTTP 会话，未注入共享会话时懒加载一个带连接池的会话"""
+        if self.session is None or self.session.closed:
+            import aiohttp
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=32,
+                    limit_per_host=8,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75
+                )
+            )
+            self._owns_session = True
+        return self.session
+
+    async def close(self):
+        """关闭提供商自行创建的会话，共享会话由插件负责关闭"""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+        self.session = None
+        self._owns_session = False
+
+    async def _request_json(self, url: str, params: Optional[Dict], key: str) -> Optional[Any]:
+        """发出带 ETag / Last-Modified 的条件请求"""
+        self._check_cooldown()
+        cached = self.etag_cache.get(key) if self.etag_cache is not None else None
+        
+        headers = self.get_headers()
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            # 没有 ETag 时先用 HEAD 探测，未变化则无需下载响应体
+            if self.HEAD_PROBE and last_modified and not etag:
+                if await self._probe_unchanged(url, params, last_modified):
+                    return cached[2]
+        
         try:
-            async with self.session.get(
-                url, 
-                headers=self.get_headers(), 
-                params=params,
-                timeout=aiohttp.ClientTimeout(total=30)
-            ) as resp:
-                if resp.status == 200:
-                    return await resp.json()
-                elif resp.status == 404:
-                    return None
-                else:
-                    return None
-        except Exception:
+            status, resp_headers, body = await self._get(url, params, headers)
+        except Exception as e:
+            raise ProviderError(f"请求 {url} 失败: {e!r}") from e
+        
+        self._update_rate_limit(status, resp_headers)
+        if status == 304 and cached:
+            return cached[2]
+        elif status == 200:
+            try:
+                data = _json_loads(body)
+            except ValueError as e:
+                raise ProviderError(f"解析 {url} 响应失败: {e}") from e
+            if self.etag_cache is not None:
+                self.etag_cache.put(
+                    key,
+                    resp_headers.get("ETag", ""),
+                    resp_headers.get("Last-Modified", ""),
+                    data
+                )
+            return data
+        elif status == 404:
+            if self.etag_cache is not None:
+                self.etag_cache.discard(key)
             return None
+        elif status in (403, 429) and self._cooldown_until > time.monotonic():
+            raise RateLimitError(
+                f"{self.name} API 触发限流",
+                self._cooldown_until - time.monotonic()
+            )
+        else:
+            raise ProviderError(f"{self.name} API 返回 {status}: {url}")
 
-    async def _fetch_all_pages(self, url: str, params: Dict = None, max_pages: int = 10) -> List[Dict]:
-        """获取所有分页数据"""
-        if not self.session:
-            await self.init()
-        
-        import aiohttp
-        all_data = []
-        page = 1
-        per_page = 100
+    async def _probe_unchanged(self, url: str, params: Optional[Dict], last_modified: str) -> bool:
+        """用 HEAD 请求比较 Last-Modified，判断资源是否未变化"""
+        headers = self.get_headers()
+        headers["If-Modified-Since"] = last_modified
+        try:
+            status, resp_headers, _ = await self._get(url, params, headers, method="HEAD")
+        except Exception:
+            return False
+        self._update_rate_limit(status, resp_headers)
+        if status == 304:
+            return True
+        return status == 200 and resp_headers.get("Last-Modified", "") == last_modified
+
+    async def _fetch_page(self, url: str, params: Dict) -> Tuple[Optional[Any], Mapping[str, str]]:
+        """获取单页数据，返回 (数据, 响应头)，失败时数据为 None"""
+        if self._cooldown_until > time.monotonic():
+            return None, {}
+        try:
+            status, headers, body = await self._get(url, params, self.get_headers())
+            self._update_rate_limit(status, headers)
+            if status != 200:
+                return None, headers
+            return _json_loads(body), headers
+        except Exception:
+            return None, {}
+
+    @staticmethod
+    def _parse_last_page(headers: Mapping[str, str]) -> Optional[int]:
+        """从响应头解析总页数（GitLab X-Total-Pages 或 Link rel="last"）"""
+        total_pages = headers.get("X-Total-Pages", "")
+        if total_pages.isdigit():
+            return int(total_pages)
+        match = _LINK_LAST_PAGE_RE.search(headers.get("Link", ""))
+        if match:
+            return int(match.group(1))
+        return None
+
+    async def _fetch_pages_stream(
+        self, url: str, params: Dict = None, max_pages: int = 10, per_page: int = 100
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        逐页产出分页数据
         
+        第一页失败时不产出任何数据；之后任一页失败时抛出 ProviderError，
+        避免调用方把缺页的结果当作完整列表。
+        """
         base_params = params or {}
         
-        while page <= max_pages:
-            page_params = {**base_params, "page": page, "per_page": per_page}
-            
+        data, headers = await self._fetch_page(url, {**base_params, "page": 1, "per_page": per_page})
+        if not data or not isinstance(data, list):
+            return
+        yield data
+        if len(data) < per_page:
+            return
+        
+        last_page = self._parse_last_page(headers)
+        if last_page is not None:
+            # 已知总页数，并发获取剩余页并按页序产出（并发数由 _get 统一限制）
+            tasks = [
+                asyncio.ensure_future(
+                    self._fetch_page(url, {**base_params, "page": page, "per_page": per_page})
+                )
+                for page in range(2, min(last_page, max_pages) + 1)
+            ]
             try:
-                async with self.session.get(
-                    url,
-                    headers=self.get_headers(),
-                    params=page_params,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as resp:
-                    if resp.status != 200:
-                        break
-                    
-                    data = await resp.json()
-                    if not data:
-                        break
-                    
-                    if isinstance(data, list):
-                        all_data.extend(data)
-                        if len(data) < per_page:
-                            break
-                    else:
-                        break
-                    
-                    page += 1
-            except Exception:
-                break
+                for page, task in enumerate(tasks, 2):
+                    page_data, _ = await task
+                    if not isinstance(page_data, list):
+                        # 中间页失败时结果不完整，不能当作完整列表使用
+                        raise ProviderError(f"获取 {url} 第 {page} 页失败")
+                    yield page_data
+            finally:
+                # 调用方提前结束迭代时取消剩余请求
+                for task in tasks:
+                    task.cancel()
+            return
         
+        # 服务器未提供分页信息时逐页获取
+        page = 2
+        while page <= max_pages:
+            data, _ = await self._fetch_page(url, {**base_params, "page": page, "per_page": per_page})
+            if not isinstance(data, list):
+                raise ProviderError(f"获取 {url} 第 {page} 页失败")
+            if not data:
+                break
+            yield data
+            if len(data) < per_page:
+                break
+            page += 1
+
+    async def _fetch_all_pages(
+        self, url: str, params: Dict = None, max_pages: int = 10, per_page: int = 100
+    ) -> List[Dict]:
+        """获取所有分页数据"""
+        all_data = []
+        async for data in self._fetch_pages_stream(url, params, max_pages, per_page):
+            all_data.extend(data)
         return all_data
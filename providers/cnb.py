@@ -1,7 +1,7 @@
 """
 CNB (cnb.cool) 服务提供商
 """
-from typing import Optional, List
+from typing import Optional, AsyncIterator, Callable
 from .base import BaseGitProvider, CommitInfo, ReleaseInfo, RepoInfo
 
 
@@ -22,15 +22,16 @@ class CNBProvider(BaseGitProvider):
     def api_url(self) -> str:
         return self._api_url
 
-    async def get_default_branch(self, repo: str) -> str:
+    async def _fetch_default_branch(self, repo: str) -> Optional[str]:
         url = f"{self._api_url}/{repo}/-/git/head"
         data = await self._fetch_json(url)
         if data and "name" in data:
             return data["name"]
-        return "main"
+        return None
 
     async def get_latest_commit(self, repo: str, branch: str = "") -> Optional[CommitInfo]:
-        if not branch:
+        use_default = not branch
+        if use_default:
             branch = await self.get_default_branch(repo)
         
         # CNB 的 commits API
@@ -42,21 +43,19 @@ class CNBProvider(BaseGitProvider):
         data = await self._fetch_json(url)
         
         if not data:
+            if use_default:
+                # 默认分支可能已变更，下次重新获取
+                self.invalidate_default_branch(repo)
             return None
         
-        # 如果返回的是列表，取第一个
-        if isinstance(data, list):
-            if len(data) == 0:
-                return None
-            commit = data[0]
-        else:
-            commit = data
+        # 如果返回的是列表，取第一个（空列表已由 not data 排除）
+        commit = data[0] if isinstance(data, list) else data
         
         sha = commit.get("sha", commit.get("id", ""))
         
         return CommitInfo(
             sha=sha,
-            message=commit.get("message", "").split("\n")[0],
+            message=self._first_line(commit.get("message") or ""),
             author=commit.get("author", {}).get("name", commit.get("author_name", "Unknown")),
             date=self._parse_datetime(commit.get("committed_date", commit.get("created_at", ""))),
             branch=branch,
@@ -72,18 +71,12 @@ class CNBProvider(BaseGitProvider):
         if not data:
             return None
         
-        # 如果返回的是列表，取第一个
-        if isinstance(data, list):
-            if len(data) == 0:
-                return None
-            release = data[0]
-        else:
-            release = data
+        # 如果返回的是列表，取第一个（空列表已由 not data 排除）
+        release = data[0] if isinstance(data, list) else data
         
         tag = release.get("tag_name", release.get("tag", ""))
         body = release.get("body", release.get("description", ""))
-        if body:
-            body = body.split("\n")[0][:200]
+        body = self._first_line(body or "", 200)
         
         author_info = release.get("author", {}) or {}
         
@@ -98,33 +91,32 @@ class CNBProvider(BaseGitProvider):
             url=f"https://cnb.cool/{repo}/-/releases/{tag}"
         )
 
-    async def get_group_repos(self, group: str) -> List[RepoInfo]:
+    async def get_group_repos(
+        self, group: str, filter_fn: Optional[Callable[[str], bool]] = None
+    ) -> AsyncIterator[RepoInfo]:
         """
         获取 CNB 群组下的所有仓库
         
         Args:
             group: 群组名
+            filter_fn: 按仓库短名过滤，返回 False 的仓库会被跳过
         
-        Returns:
-            仓库列表
+        Yields:
+            仓库信息
         """
-        repos = []
-        
         # CNB 群组仓库 API
         url = f"{self._api_url}/{group}/-/repos"
-        data = await self._fetch_all_pages(url)
-        
-        if data:
-            for repo_data in data:
+        async for page in self._fetch_pages_stream(url):
+            for repo_data in page:
                 repo_name = repo_data.get("name", repo_data.get("path", ""))
+                if filter_fn and not filter_fn(repo_name):
+                    continue
                 full_name = f"{group}/{repo_name}"
                 
-                repos.append(RepoInfo(
+                yield RepoInfo(
                     name=full_name,
                     repo_name=repo_name,
                     default_branch=repo_data.get("default_branch", "main"),
                     description=repo_data.get("description", ""),
                     url=f"https://cnb.cool/{full_name}"
-                ))
-        
-        return repos
+                )
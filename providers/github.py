@@ -1,14 +1,24 @@
 """
 GitHub 服务提供商
 """
-from typing import Optional, List
-from .base import BaseGitProvider, CommitInfo, ReleaseInfo, RepoInfo
+import asyncio
+import hashlib
+import hmac
+import time
+from typing import Optional, AsyncIterator, Callable, List, Dict, Mapping, Tuple, Union
+from .base import BaseGitProvider, CommitInfo, ProviderError, ReleaseInfo, RepoInfo
 
 
 class GitHubProvider(BaseGitProvider):
     """GitHub 服务提供商"""
 
     DEFAULT_API_URL = "https://api.github.com/repos"
+    SUPPORTS_WEBHOOK = True
+    DEFAULT_CONCURRENCY = 8
+    # GitHub 的 HEAD 与 GET 消耗相同的配额，直接使用带 ETag 的 GET
+    HEAD_PROBE = False
+    # 群组是组织还是用户的缓存有效期（秒），过期后重新确认
+    GROUP_KIND_TTL = 7 * 86400
 
     def __init__(self, token: str = "", api_url: str = "", **kwargs):
         super().__init__(token, **kwargs)
@@ -18,6 +28,8 @@ class GitHubProvider(BaseGitProvider):
             self._base_api_url = self._api_url.replace("/repos", "")
         else:
             self._base_api_url = self._api_url.rstrip("/")
+        # 群组类型缓存: 群组名 -> ("orgs" 或 "users", 确认时间)
+        self._group_kinds: Dict[str, Tuple[str, float]] = {}
 
     @property
     def name(self) -> str:
@@ -32,21 +44,29 @@ class GitHubProvider(BaseGitProvider):
         headers["Accept"] = "application/vnd.github+json"
         return headers
 
-    async def get_default_branch(self, repo: str) -> str:
+    async def _fetch_default_branch(self, repo: str) -> Optional[str]:
         url = f"{self._api_url}/{repo}"
         data = await self._fetch_json(url)
         if data and "default_branch" in data:
             return data["default_branch"]
-        return "main"
+        return None
 
     async def get_latest_commit(self, repo: str, branch: str = "") -> Optional[CommitInfo]:
-        if not branch:
+        use_default = not branch
+        if use_default:
             branch = await self.get_default_branch(repo)
         
-        url = f"{self._api_url}/{repo}/commits/{branch}"
-        data = await self._fetch_json(url)
+        # 列表接口不含文件变更统计，响应更小
+        url = f"{self._api_url}/{repo}/commits"
+        commits = await self._fetch_json(url, {"sha": branch, "per_page": 1})
         
-        if not data or "sha" not in data:
+        if not commits or not isinstance(commits, list):
+            if use_default:
+                # 默认分支可能已变更，下次重新获取
+                self.invalidate_default_branch(repo)
+            return None
+        data = commits[0]
+        if "sha" not in data:
             return None
         
         commit = data.get("commit", {})
@@ -54,7 +74,7 @@ class GitHubProvider(BaseGitProvider):
         
         return CommitInfo(
             sha=data["sha"],
-            message=commit.get("message", "").split("\n")[0],
+            message=self._first_line(commit.get("message") or ""),
             author=author_info.get("login") or commit.get("author", {}).get("name", "Unknown"),
             date=self._parse_datetime(commit.get("author", {}).get("date", "")),
             branch=branch,
@@ -69,11 +89,16 @@ class GitHubProvider(BaseGitProvider):
         
         if not data or "tag_name" not in data:
             return None
-        
+        return self._parse_release(repo, data)
+
+    def _parse_release(self, repo: str, data: Dict) -> ReleaseInfo:
+        """将 API / Webhook 的 release 数据转换为 ReleaseInfo"""
         author_info = data.get("author", {}) or {}
-        body = data.get("body", "")
-        if body:
-            body = body.split("\n")[0][:200]
+        body = self._first_line(data.get("body") or "", 200)
+        # 仅在缺少 html_url 时才拼接链接
+        url = data.get("html_url")
+        if not url:
+            url = f"https://github.com/{repo}/releases/tag/{data.get('tag_name', '')}"
         
         return ReleaseInfo(
             tag=data.get("tag_name", ""),
@@ -83,48 +108,115 @@ class GitHubProvider(BaseGitProvider):
             date=self._parse_datetime(data.get("published_at", "")),
             repo=repo,
             provider=self.name,
-            url=data.get("html_url", f"https://github.com/{repo}/releases/tag/{data.get('tag_name', '')}")
+            url=url
         )
 
-    async def get_group_repos(self, group: str) -> List[RepoInfo]:
+    async def get_group_repos(
+        self, group: str, filter_fn: Optional[Callable[[str], bool]] = None
+    ) -> AsyncIterator[RepoInfo]:
         """
         获取 GitHub 组织/用户下的所有仓库
         
         Args:
             group: 组织名或用户名
+            filter_fn: 按仓库短名过滤，返回 False 的仓库会被跳过
         
-        Returns:
-            仓库列表
+        Yields:
+            仓库信息
         """
-        repos = []
-        
-        # 先尝试作为组织获取
-        org_url = f"{self._base_api_url}/orgs/{group}/repos"
-        org_repos = await self._fetch_all_pages(org_url)
+        cached = self._group_kinds.get(group)
+        if cached and time.time() - cached[1] < self.GROUP_KIND_TTL:
+            kind = cached[0]
+        else:
+            kind = await self._resolve_group_kind(group)
+        if kind:
+            pages = self._fetch_pages_stream(self._group_repos_url(group, kind))
+        else:
+            # 无法确认类型时同时请求组织和用户接口，组织优先，不缓存类型
+            org_data, user_data = await asyncio.gather(
+                self._fetch_all_pages(self._group_repos_url(group, "orgs")),
+                self._fetch_all_pages(self._group_repos_url(group, "users"))
+            )
+            pages = self._single_page(org_data or user_data)
         
-        if org_repos:
-            for repo_data in org_repos:
-                repos.append(RepoInfo(
+        async for page in pages:
+            for repo_data in page:
+                repo_name = repo_data.get("name", "")
+                if filter_fn and not filter_fn(repo_name):
+                    continue
+                yield RepoInfo(
                     name=repo_data.get("full_name", ""),
-                    repo_name=repo_data.get("name", ""),
+                    repo_name=repo_name,
                     default_branch=repo_data.get("default_branch", "main"),
                     description=repo_data.get("description", ""),
                     url=repo_data.get("html_url", "")
-                ))
-            return repos
+                )
+
+    async def _resolve_group_kind(self, group: str) -> Optional[str]:
+        """
+        确认群组是组织（orgs）还是用户（users）
+
+        只有组织接口明确返回 404 时才认定为用户；请求失败或限流时返回 None，
+        避免把组织误判为用户而在缓存有效期内只能获取到公开仓库。
+        """
+        try:
+            org = await self._fetch_json(f"{self._base_api_url}/orgs/{group}")
+        except ProviderError:
+            return None
+        kind = "orgs" if org is not None else "users"
+        self._group_kinds[group] = (kind, time.time())
+        return kind
+
+    @staticmethod
+    async def _single_page(data: List[Dict]) -> AsyncIterator[List[Dict]]:
+        """将已获取的数据包装为单页的分页流"""
+        yield data
+
+    def _group_repos_url(self, group: str, kind: str) -> str:
+        """组织（orgs）或用户（users）的仓库列表地址"""
+        return f"{self._base_api_url}/{kind}/{group}/repos"
+
+    def verify_webhook(self, headers: Mapping[str, str], body: bytes, secret: str) -> bool:
+        """校验 X-Hub-Signature-256 签名"""
+        if not secret:
+            return False
+        signature = headers.get("X-Hub-Signature-256", "")
+        expected = "sha256=" + hmac.new(
+            secret.encode("utf-8"), body, hashlib.sha256
+        ).hexdigest()
+        # compare_digest 只接受 ASCII 字符串，按字节比较以免非 ASCII 请求头引发异常
+        return hmac.compare_digest(signature.encode("utf-8", "replace"), expected.encode("utf-8"))
+
+    def parse_webhook(
+        self, headers: Mapping[str, str], payload: Dict
+    ) -> List[Union[CommitInfo, ReleaseInfo]]:
+        event = headers.get("X-GitHub-Event", "")
+        repo = (payload.get("repository") or {}).get("full_name", "")
+        if not repo:
+            return []
         
-        # 如果组织不存在，尝试作为用户获取
-        user_url = f"{self._base_api_url}/users/{group}/repos"
-        user_repos = await self._fetch_all_pages(user_url)
+        if event == "push":
+            ref = payload.get("ref", "")
+            head_commit = payload.get("head_commit")
+            # 忽略标签推送和分支删除
+            if not ref.startswith("refs/heads/") or not head_commit:
+                return []
+            author_info = head_commit.get("author", {}) or {}
+            return [CommitInfo(
+                sha=head_commit.get("id", ""),
+                message=self._first_line(head_commit.get("message") or ""),
+                author=author_info.get("username") or author_info.get("name", "Unknown"),
+                date=self._parse_datetime(head_commit.get("timestamp", "")),
+                branch=ref[len("refs/heads/"):],
+                repo=repo,
+                provider=self.name,
+                url=head_commit.get("url") or f"https://github.com/{repo}/commit/{head_commit.get('id', '')}"
+            )]
         
-        if user_repos:
-            for repo_data in user_repos:
-                repos.append(RepoInfo(
-                    name=repo_data.get("full_name", ""),
-                    repo_name=repo_data.get("name", ""),
-                    default_branch=repo_data.get("default_branch", "main"),
-                    description=repo_data.get("description", ""),
-                    url=repo_data.get("html_url", "")
-                ))
+        if event == "release" and payload.get("action") == "published":
+            release = payload.get("release") or {}
+            if release.get("draft") or release.get("prerelease"):
+                return []
+            return [self._parse_release(repo, release)]
         
-        return repos
+        return []
@@ -2,8 +2,10 @@
 GitLab 服务提供商
 支持自部署的 GitLab 实例
 """
+import functools
+import hmac
 import urllib.parse
-from typing import Optional, List
+from typing import Optional, AsyncIterator, Callable, List, Dict, Mapping, Union
 from .base import BaseGitProvider, CommitInfo, ReleaseInfo, RepoInfo
 
 
@@ -11,6 +13,7 @@ class GitLabProvider(BaseGitProvider):
     """GitLab 服务提供商"""
 
     DEFAULT_API_URL = "https://gitlab.com/api/v4"
+    SUPPORTS_WEBHOOK = True
 
     def __init__(self, token: str = "", api_url: str = "", **kwargs):
         super().__init__(token, **kwargs)
@@ -26,8 +29,10 @@ class GitLabProvider(BaseGitProvider):
     def api_url(self) -> str:
         return self._api_url
 
-    def _encode_project(self, repo: str) -> str:
-        """URL 编码项目路径"""
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _encode_project(repo: str) -> str:
+        """URL 编码项目路径（结果缓存）"""
         return urllib.parse.quote(repo, safe='')
 
     def get_headers(self) -> dict:
@@ -37,16 +42,17 @@ class GitLabProvider(BaseGitProvider):
             headers["PRIVATE-TOKEN"] = self.token
         return headers
 
-    async def get_default_branch(self, repo: str) -> str:
+    async def _fetch_default_branch(self, repo: str) -> Optional[str]:
         encoded_repo = self._encode_project(repo)
         url = f"{self._api_url}/projects/{encoded_repo}"
         data = await self._fetch_json(url)
         if data and "default_branch" in data:
             return data["default_branch"]
-        return "main"
+        return None
 
     async def get_latest_commit(self, repo: str, branch: str = "") -> Optional[CommitInfo]:
-        if not branch:
+        use_default = not branch
+        if use_default:
             branch = await self.get_default_branch(repo)
         
         encoded_repo = self._encode_project(repo)
@@ -57,7 +63,10 @@ class GitLabProvider(BaseGitProvider):
         
         data = await self._fetch_json(url, params)
         
-        if not data or not isinstance(data, list) or len(data) == 0:
+        if not data or not isinstance(data, list):
+            if use_default:
+                # 默认分支可能已变更，下次重新获取
+                self.invalidate_default_branch(repo)
             return None
         
         commit = data[0]
@@ -67,7 +76,7 @@ class GitLabProvider(BaseGitProvider):
         
         return CommitInfo(
             sha=commit.get("id", ""),
-            message=commit.get("message", "").split("\n")[0],
+            message=self._first_line(commit.get("message") or ""),
             author=commit.get("author_name", "Unknown"),
             date=self._parse_datetime(commit.get("committed_date", "")),
             branch=branch,
@@ -82,28 +91,21 @@ class GitLabProvider(BaseGitProvider):
         
         data = await self._fetch_json(url)
         
-        if not data or not isinstance(data, list) or len(data) == 0:
+        if not data or not isinstance(data, list):
             return None
         
         # 过滤 draft 版本，获取第一个正式版本
-        release = None
-        for r in data:
-            if not r.get("draft", False):
-                release = r
-                break
-        
-        if not release:
-            release = data[0]
+        release = next((r for r in data if not r.get("draft", False)), data[0])
         
         body = release.get("description", "")
-        if body:
-            body = body.split("\n")[0][:200]
+        body = self._first_line(body or "", 200)
         
         author_info = release.get("author", {}) or {}
         
         # 构建发布 URL
-        release_url = release.get("_links", {}).get("self") or \
-                      f"{self._base_url}/{repo}/-/releases/{release.get('tag_name', '')}"
+        release_url = (release.get("_links") or {}).get("self")
+        if not release_url:
+            release_url = f"{self._base_url}/{repo}/-/releases/{release.get('tag_name', '')}"
         
         return ReleaseInfo(
             tag=release.get("tag_name", ""),
@@ -116,20 +118,21 @@ class GitLabProvider(BaseGitProvider):
             url=release_url
         )
 
-    async def get_group_repos(self, group: str) -> List[RepoInfo]:
+    async def get_group_repos(
+        self, group: str, filter_fn: Optional[Callable[[str], bool]] = None
+    ) -> AsyncIterator[RepoInfo]:
         """
         获取 GitLab 群组下的所有项目
         
         Args:
             group: 群组路径 (如: my-group 或 parent-group/sub-group)
+            filter_fn: 按项目路径名过滤，返回 False 的项目会被跳过
         
-        Returns:
-            仓库列表
+        Yields:
+            仓库信息
         """
-        repos = []
-        
         # URL 编码群组路径
-        encoded_group = urllib.parse.quote(group, safe='')
+        encoded_group = self._encode_project(group)
         
         # GitLab 群组项目 API
         url = f"{self._api_url}/groups/{encoded_group}/projects"
@@ -138,16 +141,68 @@ class GitLabProvider(BaseGitProvider):
             "archived": "false"  # 不包含已归档项目
         }
         
-        projects = await self._fetch_all_pages(url, params)
-        
-        if projects:
-            for project in projects:
-                repos.append(RepoInfo(
+        async for page in self._fetch_pages_stream(url, params):
+            for project in page:
+                repo_name = project.get("path", "")
+                if filter_fn and not filter_fn(repo_name):
+                    continue
+                yield RepoInfo(
                     name=project.get("path_with_namespace", ""),
-                    repo_name=project.get("path", ""),
+                    repo_name=repo_name,
                     default_branch=project.get("default_branch", "main"),
                     description=project.get("description", ""),
                     url=project.get("web_url", "")
-                ))
-        
-        return repos
+                )
+
+    def verify_webhook(self, headers: Mapping[str, str], body: bytes, secret: str) -> bool:
+        """校验 X-Gitlab-Token（GitLab 以明文方式回传密钥）"""
+        if not secret:
+            return False
+        # compare_digest 只接受 ASCII 字符串，按字节比较以免非 ASCII 请求头引发异常
+        token = headers.get("X-Gitlab-Token", "")
+        return hmac.compare_digest(token.encode("utf-8", "replace"), secret.encode("utf-8"))
+
+    def parse_webhook(
+        self, headers: Mapping[str, str], payload: Dict
+    ) -> List[Union[CommitInfo, ReleaseInfo]]:
+        event = headers.get("X-Gitlab-Event", "")
+        repo = (payload.get("project") or {}).get("path_with_namespace", "")
+        if not repo:
+            return []
+        
+        if event == "Push Hook":
+            ref = payload.get("ref", "")
+            sha = payload.get("checkout_sha")
+            # 忽略分支删除
+            if not ref.startswith("refs/heads/") or not sha:
+                return []
+            commits = payload.get("commits") or []
+            commit = next((c for c in commits if c.get("id") == sha), commits[-1] if commits else {})
+            author_info = commit.get("author", {}) or {}
+            return [CommitInfo(
+                sha=sha,
+                message=self._first_line(commit.get("message") or ""),
+                author=author_info.get("name") or payload.get("user_username", "Unknown"),
+                date=self._parse_datetime(commit.get("timestamp", "")),
+                branch=ref[len("refs/heads/"):],
+                repo=repo,
+                provider=self.name,
+                url=commit.get("url") or f"{self._base_url}/{repo}/-/commit/{sha}"
+            )]
+        
+        if event == "Release Hook" and payload.get("action") == "create":
+            body = payload.get("description", "")
+            body = self._first_line(body or "", 200)
+            tag = payload.get("tag", "")
+            return [ReleaseInfo(
+                tag=tag,
+                name=payload.get("name", tag),
+                body=body or "无更新说明",
+                author="",
+                date=self._parse_datetime(payload.get("released_at", "")),
+                repo=repo,
+                provider=self.name,
+                url=payload.get("url") or f"{self._base_url}/{repo}/-/releases/{tag}"
+            )]
+        
+        return []
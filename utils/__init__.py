@@ -2,7 +2,8 @@
 工具模块
 """
 from .config import PluginConfig, ProviderConfig, RepoWatchConfig, GroupWatchConfig
-from .storage import DataStorage, UpdateCache
+from .storage import DataStorage, UpdateCache, ETagCache
+from .webhook import WebhookServer
 
 __all__ = [
     "PluginConfig",
@@ -11,4 +12,6 @@ __all__ = [
     "GroupWatchConfig",
     "DataStorage",
     "UpdateCache",
+    "ETagCache",
+    "WebhookServer",
 ]
@@ -4,10 +4,51 @@
 """
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
+import hashlib
 import json
 
+# 优先使用 orjson 解析字符串形式的配置，未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
-@dataclass
+# 监听配置的别名键 -> 标准键
+_ALIASES = {
+    "org": "group",
+    "organization": "group",
+    "include": "include_repos",
+    "exclude": "exclude_repos",
+    "type": "watch_type",
+}
+
+
+def _maybe_json(value: Any, default: Any) -> Any:
+    """配置项可能是 JSON 字符串，解析失败或类型不符时返回默认值"""
+    if isinstance(value, (list, dict)):
+        return value
+    if not isinstance(value, str):
+        return default
+    try:
+        return _json_loads(value)
+    except ValueError:
+        return default
+
+
+def _normalize_keys(data: Dict) -> Dict:
+    """将别名键一次性转换为标准键，同时存在时标准键优先"""
+    norm = {}
+    for key, value in data.items():
+        canonical = _ALIASES.get(key)
+        if canonical is None:
+            norm[key] = value
+        else:
+            norm.setdefault(canonical, value)
+    return norm
+
+
+@dataclass(slots=True)
 class RepoWatchConfig:
     """仓库监听配置"""
     provider: str  # github, gitlab, cnb
@@ -18,11 +59,12 @@ class RepoWatchConfig:
 
     @classmethod
     def from_dict(cls, data: Dict) -> "RepoWatchConfig":
+        data = _normalize_keys(data)
         return cls(
             provider=data.get("provider", ""),
             repo=data.get("repo", ""),
             branch=data.get("branch", ""),
-            watch_type=data.get("watch_type", data.get("type", "commits")),
+            watch_type=data.get("watch_type", "commits"),
             note=data.get("note", "")
         )
 
@@ -40,7 +82,7 @@ class RepoWatchConfig:
         return f"{self.provider}:{self.repo}:{self.branch}:{self.watch_type}"
 
 
-@dataclass
+@dataclass(slots=True)
 class GroupWatchConfig:
     """群组/组织监听配置"""
     provider: str  # github, gitlab, cnb
@@ -50,15 +92,24 @@ class GroupWatchConfig:
     exclude_repos: List[str] = field(default_factory=list)  # 排除这些仓库
     branch: str = ""  # 默认分支，为空则使用各仓库默认分支
     note: str = ""  # 备注
+    # 由 include_repos / exclude_repos 构建的集合，不参与初始化和比较
+    _include_set: frozenset = field(default=frozenset(), init=False, repr=False, compare=False)
+    _exclude_set: frozenset = field(default=frozenset(), init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # 预先构建集合，should_watch_repo 只需两次哈希查找
+        self._include_set = frozenset(self.include_repos)
+        self._exclude_set = frozenset(self.exclude_repos)
 
     @classmethod
     def from_dict(cls, data: Dict) -> "GroupWatchConfig":
+        data = _normalize_keys(data)
         return cls(
             provider=data.get("provider", ""),
-            group=data.get("group", data.get("org", data.get("organization", ""))),
-            watch_type=data.get("watch_type", data.get("type", "commits")),
-            include_repos=data.get("include_repos", data.get("include", [])),
-            exclude_repos=data.get("exclude_repos", data.get("exclude", [])),
+            group=data.get("group", ""),
+            watch_type=data.get("watch_type", "commits"),
+            include_repos=data.get("include_repos", []),
+            exclude_repos=data.get("exclude_repos", []),
             branch=data.get("branch", ""),
             note=data.get("note", "")
         )
@@ -74,18 +125,23 @@ class GroupWatchConfig:
             "note": self.note
         }
 
+    def get_config_version(self) -> str:
+        """获取配置版本（配置内容的哈希），配置变化时版本随之变化"""
+        raw = json.dumps(self.to_dict(), sort_keys=True).encode("utf-8")
+        return hashlib.blake2b(raw).hexdigest()[:16]
+
     def should_watch_repo(self, repo_name: str) -> bool:
         """判断是否应该监听该仓库"""
         # 如果在排除列表中，不监听
-        if repo_name in self.exclude_repos:
+        if repo_name in self._exclude_set:
             return False
         # 如果指定了包含列表，只监听列表中的仓库
-        if self.include_repos and repo_name not in self.include_repos:
+        if self._include_set and repo_name not in self._include_set:
             return False
         return True
 
 
-@dataclass
+@dataclass(slots=True)
 class PushTargetConfig:
     """推送目标配置"""
     groups: List[str] = field(default_factory=list)  # 推送的群聊
@@ -99,7 +155,7 @@ class PushTargetConfig:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class WatchTargetConfig:
     """监听目标配置（包含推送目标）"""
     # 监听配置
@@ -133,13 +189,17 @@ class WatchTargetConfig:
         return config
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderConfig:
     """提供商配置"""
     name: str
     enabled: bool = True
     token: str = ""
     api_url: str = ""  # 用于自部署实例
+    webhook_secret: str = ""  # Webhook 签名密钥，为空则不接收该提供商的 Webhook
+    concurrency: int = 0  # 同时进行的请求数上限，0 表示使用提供商默认值
+    max_per_second: float = 0  # 每秒请求数上限，0 表示不限制
+    http2: bool = False  # 该提供商使用 HTTP/2（全局 http2 开启时所有提供商都使用）
 
     @classmethod
     def from_dict(cls, name: str, data: Dict) -> "ProviderConfig":
@@ -147,17 +207,32 @@ class ProviderConfig:
             name=name,
             enabled=data.get("enabled", True),
             token=data.get("token", ""),
-            api_url=data.get("api_url", data.get("url", ""))
+            api_url=data.get("api_url", data.get("url", "")),
+            webhook_secret=data.get("webhook_secret", data.get("secret", "")),
+            concurrency=max(0, int(data.get("concurrency", 0))),
+            max_per_second=max(0.0, float(data.get("max_per_second", 0))),
+            http2=data.get("http2", False)
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class PluginConfig:
     """插件配置"""
     # 全局设置
     auto_check: bool = False
     check_interval: int = 1800  # 秒
     first_push: bool = False
+    max_concurrency: int = 8  # 同时检查的仓库数上限
+    group_ttl: int = 3600  # 群组仓库列表缓存有效期（秒）
+    backoff_base: int = 60  # 检查失败后的初始退避时间（秒）
+    backoff_max: int = 3600  # 最长退避时间（秒）
+    http2: bool = False  # 使用 httpx 的 HTTP/2 连接（需安装 httpx[http2]）
+    
+    # Webhook 设置
+    webhook_enabled: bool = False
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 6190
+    webhook_fallback_interval: int = 21600  # 开启 Webhook 后兜底轮询间隔（秒）
     
     # 提供商配置
     providers: Dict[str, ProviderConfig] = field(default_factory=dict)
@@ -172,8 +247,18 @@ class PluginConfig:
     # 群组监听列表
     watch_groups: List[GroupWatchConfig] = field(default_factory=list)
     
-    # 高级监听配置（包含独立推送目标）
-    watch_targets: List[WatchTargetConfig] = field(default_factory=list)
+    # 高级监听配置（包含独立推送目标），保存原始数据，首次访问 watch_targets 时才解析
+    _raw_watch_targets: List[Dict] = field(default_factory=list, repr=False)
+    _watch_targets: Optional[List[WatchTargetConfig]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def watch_targets(self) -> List[WatchTargetConfig]:
+        """高级监听配置"""
+        if self._watch_targets is None:
+            self._watch_targets = [
+                WatchTargetConfig.from_dict(target_data) for target_data in self._raw_watch_targets
+            ]
+        return self._watch_targets
 
     @classmethod
     def from_dict(cls, data: Dict) -> "PluginConfig":
@@ -183,6 +268,17 @@ class PluginConfig:
         config.auto_check = data.get("auto_check", False)
         config.check_interval = data.get("check_interval", 1800)
         config.first_push = data.get("first_push", False)
+        config.max_concurrency = max(1, int(data.get("max_concurrency", 8)))
+        config.group_ttl = data.get("group_ttl", 3600)
+        config.backoff_base = data.get("backoff_base", 60)
+        config.backoff_max = data.get("backoff_max", 3600)
+        config.http2 = data.get("http2", False)
+        
+        # Webhook 设置
+        config.webhook_enabled = data.get("webhook_enabled", False)
+        config.webhook_host = data.get("webhook_host", "0.0.0.0")
+        config.webhook_port = data.get("webhook_port", 6190)
+        config.webhook_fallback_interval = data.get("webhook_fallback_interval", 21600)
         
         # 提供商配置
         provider_names = ["github", "gitlab", "cnb"]
@@ -196,21 +292,32 @@ class PluginConfig:
                 name="github",
                 enabled=data.get("github_enabled", True),
                 token=data.get("github_token", ""),
-                api_url=""
+                api_url="",
+                webhook_secret=data.get("github_webhook_secret", ""),
+                concurrency=max(0, int(data.get("github_concurrency", 0))),
+                max_per_second=max(0.0, float(data.get("github_max_per_second", 0))),
+                http2=data.get("github_http2", False)
             )
         if "gitlab_enabled" in data:
             config.providers["gitlab"] = ProviderConfig(
                 name="gitlab",
                 enabled=data.get("gitlab_enabled", True),
                 token=data.get("gitlab_token", ""),
-                api_url=data.get("gitlab_url", "")
+                api_url=data.get("gitlab_url", ""),
+                webhook_secret=data.get("gitlab_webhook_secret", ""),
+                concurrency=max(0, int(data.get("gitlab_concurrency", 0))),
+                max_per_second=max(0.0, float(data.get("gitlab_max_per_second", 0))),
+                http2=data.get("gitlab_http2", False)
             )
         if "cnb_enabled" in data:
             config.providers["cnb"] = ProviderConfig(
                 name="cnb",
                 enabled=data.get("cnb_enabled", True),
                 token=data.get("cnb_token", ""),
-                api_url=""
+                api_url="",
+                concurrency=max(0, int(data.get("cnb_concurrency", 0))),
+                max_per_second=max(0.0, float(data.get("cnb_max_per_second", 0))),
+                http2=data.get("cnb_http2", False)
             )
         
         # 全局推送目标
@@ -231,38 +338,25 @@ class PluginConfig:
         """解析推送目标"""
         for key in ["push_groups", "groups"]:
             if key in data:
-                push_groups = data[key]
-                if isinstance(push_groups, str):
-                    # 支持逗号分隔的格式
-                    if push_groups.strip():
-                        # 尝试 JSON 解析
-                        try:
-                            self.push_groups = json.loads(push_groups)
-                        except:
-                            # 尝试逗号分隔格式
-                            self.push_groups = [g.strip() for g in push_groups.split(",") if g.strip()]
-                    else:
-                        self.push_groups = []
-                else:
-                    self.push_groups = list(push_groups)
+                self.push_groups = self._parse_id_list(data[key])
                 break
         
         for key in ["push_users", "users"]:
             if key in data:
-                push_users = data[key]
-                if isinstance(push_users, str):
-                    # 支持逗号分隔的格式
-                    if push_users.strip():
-                        try:
-                            self.push_users = json.loads(push_users)
-                        except:
-                            self.push_users = [u.strip() for u in push_users.split(",") if u.strip()]
-                    else:
-                        self.push_users = []
-                else:
-                    self.push_users = list(push_users)
+                self.push_users = self._parse_id_list(data[key])
                 break
 
+    @staticmethod
+    def _parse_id_list(value: Any) -> List[str]:
+        """解析 ID 列表，支持列表、JSON 字符串和逗号分隔的字符串"""
+        if not isinstance(value, str):
+            return list(value)
+        parsed = _maybe_json(value, None)
+        if parsed is None:
+            # 尝试逗号分隔格式
+            return [v.strip() for v in value.split(",") if v.strip()]
+        return parsed
+
     def _parse_watch_repos(self, data: Dict):
         """解析仓库监听配置"""
         watch_repos_data = None
@@ -272,11 +366,7 @@ class PluginConfig:
                 break
         
         if watch_repos_data:
-            if isinstance(watch_repos_data, str):
-                try:
-                    watch_repos_data = json.loads(watch_repos_data)
-                except:
-                    watch_repos_data = []
+            watch_repos_data = _maybe_json(watch_repos_data, [])
             
             for repo_data in watch_repos_data:
                 self.watch_repos.append(RepoWatchConfig.from_dict(repo_data))
@@ -294,11 +384,7 @@ class PluginConfig:
                 break
         
         if watch_groups_data:
-            if isinstance(watch_groups_data, str):
-                try:
-                    watch_groups_data = json.loads(watch_groups_data)
-                except:
-                    watch_groups_data = []
+            watch_groups_data = _maybe_json(watch_groups_data, [])
             
             for group_data in watch_groups_data:
                 self.watch_groups.append(GroupWatchConfig.from_dict(group_data))
@@ -308,14 +394,11 @@ class PluginConfig:
         watch_targets_data = data.get("watch_targets", [])
         
         if watch_targets_data:
-            if isinstance(watch_targets_data, str):
-                try:
-                    watch_targets_data = json.loads(watch_targets_data)
-                except:
-                    watch_targets_data = []
+            watch_targets_data = _maybe_json(watch_targets_data, [])
             
-            for target_data in watch_targets_data:
-                self.watch_targets.append(WatchTargetConfig.from_dict(target_data))
+            # 延迟到首次访问 watch_targets 时再构建配置对象
+            self._raw_watch_targets = list(watch_targets_data)
+            self._watch_targets = None
 
     def get_provider_config(self, provider_name: str) -> Optional[ProviderConfig]:
         """获取提供商配置"""
@@ -1,72 +1,487 @@
 """
 数据存储模块
 """
+import asyncio
+import atexit
+import functools
+import hashlib
+import mmap
 import os
 import json
-from typing import Dict, Any, Optional, Set
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import BinaryIO, Dict, Any, Callable, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+def _json_default(obj: Any) -> Any:
+    """序列化时将集合转换为列表，内存中可直接保存集合"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"无法序列化的类型: {type(obj).__name__}")
+
+
+# 优先使用 orjson 读写缓存文件，未安装时回退到标准库
+try:
+    import orjson
+
+    def _json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+    _json_loads = json.loads
+
+
+# 安装了 msgpack 时缓存日志使用二进制格式，否则使用 JSON Lines
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 
 class DataStorage:
     """数据存储"""
 
+    # 缓存日志至少积累到该记录数才考虑压缩
+    COMPACT_MIN_RECORDS = 256
+    # 超过该大小（字节）的缓存日志使用 mmap 读取
+    MMAP_THRESHOLD = 64 * 1024
+
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
-        self.cache_file = os.path.join(data_dir, "cache.json")
+        # 更新缓存以追加日志形式保存（msgpack 或 JSON Lines），旧版为整文件 JSON
+        msgpack_file = os.path.join(data_dir, "cache.msgpack")
+        jsonl_file = os.path.join(data_dir, "cache.jsonl")
+        self.cache_file = msgpack_file if msgpack is not None else jsonl_file
+        # 可读取并迁移的其他格式的缓存日志
+        self._other_cache_files = [jsonl_file] if msgpack is not None else []
+        # 未安装 msgpack 时无法读取的缓存日志
+        self._unreadable_cache_file = msgpack_file if msgpack is None else None
+        self.legacy_cache_file = os.path.join(data_dir, "cache.json")
+        # 本次加载的缓存是否来自其他格式或末尾残缺，需要整体重写
+        self.cache_needs_rewrite = False
+        self.etag_file = os.path.join(data_dir, "etag.json")
+        self.branch_file = os.path.join(data_dir, "default_branches.json")
+        # 各文件最近一次写入内容的哈希，用于跳过重复写入
+        self._last_hashes: Dict[str, bytes] = {}
+        # 缓存日志中的记录条数，用于判断何时压缩
+        self._log_records = 0
+        # 缓存日志中最后一条完整记录的结束位置
+        self._log_end = 0
         self._ensure_dir()
 
     def _ensure_dir(self):
         """确保目录存在"""
         os.makedirs(self.data_dir, exist_ok=True)
 
-    def load_cache(self) -> Dict[str, Any]:
-        """加载缓存数据"""
-        if os.path.exists(self.cache_file):
+    def _read_json(self, path: str) -> Dict[str, Any]:
+        """读取 JSON 文件，不存在或损坏时返回空字典"""
+        try:
+            with open(path, "rb") as f:
+                return _json_loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def encode_json(data: Any) -> bytes:
+        """编码为 JSON，用于在事件循环中编码、在线程中写入"""
+        return _json_dumps(data)
+
+    def write_files(self, files: Iterable[Tuple[str, bytes]]):
+        """写入已编码的文件（路径, 内容）"""
+        for path, raw in files:
             try:
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                self._write_atomic(path, raw)
             except Exception:
                 pass
-        return {}
 
-    def save_cache(self, cache: Dict[str, Any]):
-        """保存缓存数据"""
+    def _write_atomic(self, path: str, raw: bytes):
+        """内容未变化时跳过，否则写入临时文件后原子替换"""
+        digest = hashlib.blake2b(raw, digest_size=8).digest()
+        if self._last_hashes.get(path) == digest:
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._last_hashes[path] = digest
+
+    def load_cache(self) -> Dict[str, Any]:
+        """
+        加载缓存数据（按顺序回放缓存日志，后写入的记录覆盖先写入的）
+        
+        Raises:
+            RuntimeError: 存在 msgpack 格式的缓存日志但未安装 msgpack。
+                此时若从空缓存开始，所有仓库都会被当作首次检查而重复推送。
+        """
+        if self._unreadable_cache_file and os.path.exists(self._unreadable_cache_file):
+            raise RuntimeError(
+                f"缓存文件 {self._unreadable_cache_file} 为 msgpack 格式，但未安装 msgpack，请安装后重试"
+            )
+        for path in [self.cache_file] + self._other_cache_files:
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            except OSError:
+                return {}
+            self.cache_needs_rewrite = path != self.cache_file
+            return self._load_log(f, path.endswith(".msgpack"))
+        # 兼容旧版的整文件 JSON 缓存
+        return self._read_json(self.legacy_cache_file)
+
+    def _load_log(self, f: BinaryIO, binary: bool) -> Dict[str, Any]:
+        """读取并回放缓存日志文件"""
+        cache: Dict[str, Any] = {}
+        records = 0
+        size = 0
+        self._log_end = 0
         try:
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache, f, ensure_ascii=False, indent=2)
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                if size > self.MMAP_THRESHOLD:
+                    # 大文件映射到内存读取，省去缓冲读的一次复制
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        records = self._replay_log(self._decode_log(mm, binary), cache)
+                else:
+                    records = self._replay_log(self._decode_log(f, binary), cache)
         except Exception:
             pass
+        self._log_records = records
+        if self._log_end < size:
+            # 末尾有写入中断留下的残缺记录，继续追加会接在其后而无法读出，下次写入时整体重写
+            self.cache_needs_rewrite = True
+        return cache
+
+    def _decode_log(self, source: Any, binary: bool) -> Iterator[Any]:
+        """逐条解码缓存日志记录，并记录最后一条完整记录的结束位置"""
+        if binary:
+            unpacker = msgpack.Unpacker(source, raw=False)
+            for record in unpacker:
+                self._log_end = unpacker.tell()
+                yield record
+            return
+        for line in iter(source.readline, b""):
+            if not line.endswith(b"\n"):
+                # 写入中断产生的残缺行
+                break
+            try:
+                record = _json_loads(line)
+            except ValueError:
+                continue
+            self._log_end = source.tell()
+            yield record
+
+    @staticmethod
+    def _replay_log(records_iter: Iterable[Any], cache: Dict[str, Any]) -> int:
+        """将日志记录依次应用到 cache，返回有效记录数"""
+        records = 0
+        for record in records_iter:
+            if not isinstance(record, dict) or "k" not in record:
+                continue
+            records += 1
+            if record.get("v") is None:
+                cache.pop(record["k"], None)
+            else:
+                cache[record["k"]] = record["v"]
+        return records
+
+    @staticmethod
+    def encode_records(entries: Dict[str, Any]) -> bytes:
+        """将 键 -> 值 编码为缓存日志记录，值为 None 表示删除该键"""
+        if msgpack is not None:
+            packer = msgpack.Packer(default=_json_default, use_bin_type=True)
+            return b"".join(packer.pack({"k": k, "v": v}) for k, v in entries.items())
+        return b"".join(_json_dumps({"k": k, "v": v}) + b"\n" for k, v in entries.items())
+
+    def append_log(self, raw: bytes, records: int):
+        """向缓存日志追加已编码的记录"""
+        if not raw:
+            return
+        try:
+            with open(self.cache_file, "ab") as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            return
+        self._log_records += records
+        # 文件内容已变化，下次压缩不能跳过
+        self._last_hashes.pop(self.cache_file, None)
+
+    def write_log(self, raw: bytes, records: int):
+        """用已编码的全部记录重写缓存日志（压缩）"""
+        try:
+            self._write_atomic(self.cache_file, raw)
+        except Exception:
+            return
+        self._log_records = records
+        self.cache_needs_rewrite = False
+        # 已写入当前格式，删除旧格式的缓存文件
+        for path in self._other_cache_files + [self.legacy_cache_file]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def needs_compaction(self, live_entries: int, pending: int = 0) -> bool:
+        """缓存日志记录数（含待写入的记录）远多于有效条目时需要压缩"""
+        return self._log_records + pending > max(4 * live_entries, self.COMPACT_MIN_RECORDS)
+
+    def load_etags(self) -> Dict[str, Dict[str, Any]]:
+        """加载条件请求缓存（按提供商分组）"""
+        return self._read_json(self.etag_file)
+
+    def load_default_branches(self) -> Dict[str, Dict[str, Any]]:
+        """加载默认分支缓存（按提供商分组）"""
+        return self._read_json(self.branch_file)
+
+
+class ETagCache:
+    """条件请求缓存: 请求键 -> [ETag, Last-Modified, 解析后的数据]"""
+
+    # 最多保留的条目数，超出时淘汰最早写入的条目
+    MAX_ENTRIES = 1024
+    # 列表响应超过该长度时不缓存，避免保存大体积的分页数据
+    MAX_LIST_LEN = 30
+
+    def __init__(self, entries: Optional[Dict[str, List[Any]]] = None):
+        self._entries: Dict[str, List[Any]] = dict(entries or {})
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        """获取缓存条目"""
+        return self._entries.get(key)
+
+    def put(self, key: str, etag: str, last_modified: str, data: Any):
+        """写入缓存条目"""
+        if not (etag or last_modified):
+            return
+        if isinstance(data, list) and len(data) > self.MAX_LIST_LEN:
+            self.discard(key)
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = [etag, last_modified, data]
+        while len(self._entries) > self.MAX_ENTRIES:
+            del self._entries[next(iter(self._entries))]
+        self.dirty = True
+
+    def discard(self, key: str):
+        """删除缓存条目"""
+        if self._entries.pop(key, None) is not None:
+            self.dirty = True
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """导出为可持久化的字典"""
+        return self._entries
+
+
+# 缓存日志中群组数据的键前缀
+_GROUP_REPOS_PREFIX = "_group_repos:"
+_GROUP_SNAPSHOT_PREFIX = "_group_snapshots:"
 
 
 class UpdateCache:
     """更新缓存管理"""
 
+    # 修改后延迟写入磁盘的时间（秒），期间的多次修改合并为一次后台写入
+    FLUSH_DELAY = 5.0
+
     def __init__(self, storage: DataStorage):
         self.storage = storage
         self._cache: Dict[str, Dict] = {}
-        self._repo_cache: Dict[str, Set[str]] = {}  # 群组下的仓库缓存
+        self._repo_cache: Dict[str, FrozenSet[str]] = {}  # 群组下的仓库缓存（只读集合，修改时整体替换）
+        self._dirty_keys: Set[str] = set()  # 待追加到缓存日志的键
+        self._rewrite = False  # 是否需要整体重写缓存日志
+        # 反向索引: (提供商, 仓库) -> 该仓库的提交/发布缓存键
+        self._index: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()  # 写入线程间互斥
+        self._write_order: Optional[asyncio.Lock] = None  # 事件循环中按顺序写入，首次写入时创建
+        self._writing = False  # 后台任务是否正在写入
         self._load()
+        # 进程退出时写入尚未保存的修改
+        atexit.register(self.flush)
 
     def _load(self):
         """加载缓存"""
-        self._cache = self.storage.load_cache()
-        # 加载群组仓库映射
-        if "_group_repos" in self._cache:
-            for group_key, repos in self._cache["_group_repos"].items():
-                self._repo_cache[group_key] = set(repos)
-
-    def _save(self):
-        """保存缓存"""
-        # 保存群组仓库映射
-        self._cache["_group_repos"] = {
-            k: list(v) for k, v in self._repo_cache.items()
-        }
-        self.storage.save_cache(self._cache)
+        data = self.storage.load_cache()
+        snapshots: Dict[str, Any] = {}
+        
+        # 旧版缓存把群组数据整体保存在 _group_repos / _group_snapshots 下，
+        # 与其他格式或末尾残缺的缓存日志一样，载入后整体重写
+        if "_group_repos" in data or "_group_snapshots" in data or self.storage.cache_needs_rewrite:
+            self._rewrite = True
+        for group_key, repos in data.pop("_group_repos", {}).items():
+            self._repo_cache[group_key] = frozenset(map(sys.intern, repos))
+        snapshots.update(data.pop("_group_snapshots", {}))
+        
+        # 键、仓库名与发布标签在多个条目间大量重复，驻留后共享同一字符串对象
+        for key, value in data.items():
+            if key.startswith(_GROUP_REPOS_PREFIX):
+                self._repo_cache[key[len(_GROUP_REPOS_PREFIX):]] = frozenset(map(sys.intern, value))
+            elif key.startswith(_GROUP_SNAPSHOT_PREFIX):
+                snapshots[key[len(_GROUP_SNAPSHOT_PREFIX):]] = value
+            else:
+                key = sys.intern(key)
+                if isinstance(value, dict) and isinstance(value.get("tag"), str):
+                    value["tag"] = sys.intern(value["tag"])
+                self._cache[key] = value
+                self._index_entry(key)
+        if snapshots:
+            self._cache["_group_snapshots"] = snapshots
+
+    def _save(self, key: Optional[str] = None):
+        """标记缓存已修改（key 为日志键，为空表示需要整体重写），并安排后台写入"""
+        if key is None:
+            self._rewrite = True
+        else:
+            self._dirty_keys.add(key)
+        if self._flush_task is not None and not self._flush_task.done():
+            # 后台写入在结束前会检查并写入之后的修改
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环中，由调用方 flush 或退出时写入
+            return
+        self._flush_task = loop.create_task(self._flush_in_background())
+
+    async def _flush_in_background(self):
+        """等待 FLUSH_DELAY 合并修改后，在线程中写入磁盘，直到没有待写入的修改"""
+        try:
+            while self._rewrite or self._dirty_keys:
+                await asyncio.sleep(self.FLUSH_DELAY)
+                await self._write_pending()
+        finally:
+            if self._flush_task is asyncio.current_task():
+                self._flush_task = None
+
+    def _cancel_background_flush(self):
+        """取消尚未开始写入的后台任务，待写入的修改由调用方接管"""
+        task = self._flush_task
+        if task is None:
+            return
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            # 事件循环已结束，任务不会再运行
+            self._flush_task = None
+            return
+        if task is not current and not self._writing:
+            self._flush_task = None
+            task.cancel()
+
+    def flush(self):
+        """将修改一次性写入磁盘（在当前线程同步写入）"""
+        self._cancel_background_flush()
+        job = self._take_pending()
+        if job:
+            job()
+
+    async def flush_async(self):
+        """将修改一次性写入磁盘，文件读写在线程中进行，不阻塞事件循环"""
+        self._cancel_background_flush()
+        await self._write_pending()
+
+    async def close(self):
+        """写入全部修改并取消退出时写入的注册，之后不应再使用该缓存"""
+        await self.flush_async()
+        atexit.unregister(self.flush)
+
+    async def _write_pending(self):
+        """取出待写入的修改并在线程中写入，多次写入按取出顺序依次进行"""
+        if self._write_order is None:
+            self._write_order = asyncio.Lock()
+        async with self._write_order:
+            job = self._take_pending()
+            if job:
+                self._writing = True
+                try:
+                    await asyncio.to_thread(job)
+                finally:
+                    self._writing = False
+
+    def _take_pending(self) -> Optional[Callable[[], None]]:
+        """
+        在事件循环中取出待写入的修改并完成编码，返回执行文件写入的函数
+        
+        编码在取出时完成，写入线程不会读取仍在变化的内存数据；
+        写锁在写入线程中获取，不会阻塞事件循环。
+        """
+        if not self._rewrite and not self._dirty_keys:
+            return None
+        if not self._rewrite:
+            live = len(self._cache) + len(self._repo_cache) + len(self._cache.get("_group_snapshots", {}))
+            self._rewrite = self.storage.needs_compaction(live, len(self._dirty_keys))
+        
+        if self._rewrite:
+            # 整体重写（压缩）
+            data = self._export()
+            write, records = self.storage.write_log, len(data)
+        else:
+            # 只追加修改过的键
+            data = {key: self._get_entry(key) for key in self._dirty_keys}
+            write, records = self.storage.append_log, len(data)
+        raw = self.storage.encode_records(data)
+        self._rewrite = False
+        self._dirty_keys.clear()
+
+        def job():
+            with self._write_lock:
+                write(raw, records)
+        return job
+
+    def _index_entry(self, key: str):
+        """将提交/发布缓存键加入反向索引"""
+        kind, _, rest = key.partition(":")
+        provider, _, rest = rest.partition(":")
+        if kind == "commit":
+            # commit:{provider}:{repo}:{branch}
+            repo = rest.rpartition(":")[0]
+        elif kind == "release":
+            # release:{provider}:{repo}
+            repo = rest
+        else:
+            return
+        self._index[(sys.intern(provider), sys.intern(repo))].add(key)
+
+    def _get_entry(self, key: str) -> Any:
+        """获取日志键对应的当前值，已删除时返回 None"""
+        if key.startswith(_GROUP_REPOS_PREFIX):
+            return self._repo_cache.get(key[len(_GROUP_REPOS_PREFIX):])
+        if key.startswith(_GROUP_SNAPSHOT_PREFIX):
+            return self._cache.get("_group_snapshots", {}).get(key[len(_GROUP_SNAPSHOT_PREFIX):])
+        return self._cache.get(key)
+
+    def _export(self) -> Dict[str, Any]:
+        """导出全部缓存为 日志键 -> 值 的平铺字典"""
+        data = {k: v for k, v in self._cache.items() if k != "_group_snapshots"}
+        for group_key, repos in self._repo_cache.items():
+            # 集合由序列化时的 default 钩子转换，这里不复制
+            data[_GROUP_REPOS_PREFIX + group_key] = repos
+        for group_key, snapshot in self._cache.get("_group_snapshots", {}).items():
+            data[_GROUP_SNAPSHOT_PREFIX + group_key] = snapshot
+        return data
 
-    def _get_commit_key(self, provider: str, repo: str, branch: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _get_commit_key(provider: str, repo: str, branch: str) -> str:
         """生成提交缓存键"""
         return f"commit:{provider}:{repo}:{branch}"
 
-    def _get_release_key(self, provider: str, repo: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _get_release_key(provider: str, repo: str) -> str:
         """生成发布缓存键"""
         return f"release:{provider}:{repo}"
 
@@ -80,16 +495,24 @@ class UpdateCache:
     def set_cached_commit_sha(self, provider: str, repo: str, branch: str, sha: str):
         """设置缓存的提交 SHA"""
         key = self._get_commit_key(provider, repo, branch)
-        if key not in self._cache:
-            self._cache[key] = {}
-        self._cache[key]["sha"] = sha
-        self._save()
+        self._setdefault_entry(key)["sha"] = sha
+        self._save(key)
 
     def is_first_commit_check(self, provider: str, repo: str, branch: str) -> bool:
         """检查是否是首次检查提交"""
         key = self._get_commit_key(provider, repo, branch)
         return key not in self._cache
 
+    def cas_commit_sha(self, provider: str, repo: str, branch: str, sha: str) -> Tuple[Optional[str], bool]:
+        """
+        比较并更新缓存的提交 SHA
+        
+        Returns:
+            (更新前的 SHA, 是否首次检查)
+        """
+        key = self._get_commit_key(provider, repo, branch)
+        return self._cas(key, "sha", sha)
+
     # ============ 发布缓存 ============
 
     def get_cached_release_tag(self, provider: str, repo: str) -> Optional[str]:
@@ -100,40 +523,100 @@ class UpdateCache:
     def set_cached_release_tag(self, provider: str, repo: str, tag: str):
         """设置缓存的发布标签"""
         key = self._get_release_key(provider, repo)
-        if key not in self._cache:
-            self._cache[key] = {}
-        self._cache[key]["tag"] = tag
-        self._save()
+        self._setdefault_entry(key)["tag"] = tag
+        self._save(key)
 
     def is_first_release_check(self, provider: str, repo: str) -> bool:
         """检查是否是首次检查发布"""
         key = self._get_release_key(provider, repo)
         return key not in self._cache
 
+    def cas_release_tag(self, provider: str, repo: str, tag: str) -> Tuple[Optional[str], bool]:
+        """
+        比较并更新缓存的发布标签
+        
+        Returns:
+            (更新前的标签, 是否首次检查)
+        """
+        key = self._get_release_key(provider, repo)
+        return self._cas(key, "tag", tag)
+
+    def _setdefault_entry(self, key: str) -> Dict[str, Any]:
+        """获取缓存条目，不存在时创建并加入索引"""
+        size = len(self._cache)
+        entry = self._cache.setdefault(key, {})
+        if len(self._cache) != size:
+            self._index_entry(key)
+        return entry
+
+    def _cas(self, key: str, field: str, value: str) -> Tuple[Optional[str], bool]:
+        """读取旧值并在变化时写入新值，只查找一次缓存"""
+        entry = self._cache.get(key)
+        if entry is None:
+            self._cache[key] = {field: value}
+            self._index_entry(key)
+            self._save(key)
+            return None, True
+        prev = entry.get(field)
+        if prev != value:
+            entry[field] = value
+            self._save(key)
+        return prev, False
+
     # ============ 群组仓库缓存 ============
 
-    def _get_group_key(self, provider: str, group: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _get_group_key(provider: str, group: str) -> str:
         """生成群组缓存键"""
         return f"{provider}:{group}"
 
-    def get_group_cached_repos(self, provider: str, group: str) -> Set[str]:
+    def get_group_cached_repos(self, provider: str, group: str) -> FrozenSet[str]:
         """获取群组已缓存的仓库列表"""
         key = self._get_group_key(provider, group)
-        return self._repo_cache.get(key, set())
+        return self._repo_cache.get(key, frozenset())
 
-    def set_group_cached_repos(self, provider: str, group: str, repos: Set[str]):
+    def set_group_cached_repos(self, provider: str, group: str, repos: Iterable[str]):
         """设置群组已缓存的仓库列表"""
         key = self._get_group_key(provider, group)
-        self._repo_cache[key] = repos
-        self._save()
+        self._repo_cache[key] = frozenset(repos)
+        self._save(_GROUP_REPOS_PREFIX + key)
 
     def add_repo_to_group_cache(self, provider: str, group: str, repo: str):
         """向群组缓存添加仓库"""
         key = self._get_group_key(provider, group)
-        if key not in self._repo_cache:
-            self._repo_cache[key] = set()
-        self._repo_cache[key].add(repo)
-        self._save()
+        repos = self._repo_cache.get(key, frozenset())
+        if repo in repos:
+            return
+        self._repo_cache[key] = repos | {repo}
+        self._save(_GROUP_REPOS_PREFIX + key)
+
+    def batch_add_to_group_cache(self, provider: str, group: str, repos: Iterable[str]):
+        """向群组缓存批量添加仓库，只合并并保存一次"""
+        key = self._get_group_key(provider, group)
+        old = self._repo_cache.get(key, frozenset())
+        new = old.union(repos)
+        if len(new) == len(old):
+            return
+        self._repo_cache[key] = new
+        self._save(_GROUP_REPOS_PREFIX + key)
+
+    def get_group_snapshot(self, provider: str, group: str) -> Optional[Dict[str, Any]]:
+        """获取群组仓库列表快照 {"fetched_at": 获取时间, "version": 群组配置版本, "repos": 仓库列表}"""
+        key = self._get_group_key(provider, group)
+        return self._cache.get("_group_snapshots", {}).get(key)
+
+    def set_group_snapshot(
+        self, provider: str, group: str, repos: List[Dict[str, str]], version: str = ""
+    ):
+        """设置群组仓库列表快照"""
+        key = self._get_group_key(provider, group)
+        self._cache.setdefault("_group_snapshots", {})[key] = {
+            "fetched_at": time.time(),
+            "version": version,
+            "repos": repos
+        }
+        self._save(_GROUP_SNAPSHOT_PREFIX + key)
 
     # ============ 通用方法 ============
 
@@ -148,32 +631,38 @@ class UpdateCache:
         """清除缓存"""
         if provider and repo:
             # 清除特定仓库的缓存
-            keys_to_remove = [k for k in self._cache 
-                            if not k.startswith("_") and f"{provider}:{repo}" in k]
-            for key in keys_to_remove:
-                del self._cache[key]
+            index_keys = [(provider, repo)]
         elif provider:
             # 清除特定提供商的缓存
-            keys_to_remove = [k for k in self._cache 
-                            if not k.startswith("_") and k.endswith(f":{provider}") or f":{provider}:" in k]
-            for key in keys_to_remove:
-                del self._cache[key]
+            index_keys = [k for k in self._index if k[0] == provider]
         else:
             # 清除所有缓存（保留元数据）
             self._cache = {k: v for k, v in self._cache.items() if k.startswith("_")}
             self._repo_cache = {}
-        self._save()
+            self._index.clear()
+            self._save()
+            return
+        
+        for index_key in index_keys:
+            for key in self._index.pop(index_key, ()):
+                if self._cache.pop(key, None) is not None:
+                    self._save(key)
 
     def clear_group_cache(self, provider: str = None, group: str = None):
         """清除群组缓存"""
+        snapshots = self._cache.get("_group_snapshots", {})
         if provider and group:
             key = self._get_group_key(provider, group)
             if key in self._repo_cache:
                 del self._repo_cache[key]
+            snapshots.pop(key, None)
         elif provider:
             keys_to_remove = [k for k in self._repo_cache if k.startswith(f"{provider}:")]
             for key in keys_to_remove:
                 del self._repo_cache[key]
+            for key in [k for k in snapshots if k.startswith(f"{provider}:")]:
+                del snapshots[key]
         else:
             self._repo_cache = {}
+            snapshots.clear()
         self._save()
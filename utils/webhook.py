@@ -0,0 +1,51 @@
+"""
+Webhook 接收模块
+提供 /webhook/{provider} 接口接收 Git 服务提供商的事件推送
+"""
+from typing import Awaitable, Callable, Mapping, Optional
+
+from aiohttp import web
+
+# 处理函数: (提供商名称, 请求头, 原始请求体) -> HTTP 状态码
+WebhookHandler = Callable[[str, Mapping[str, str], bytes], Awaitable[int]]
+
+
+class WebhookServer:
+    """Webhook 服务"""
+
+    def __init__(self, host: str, port: int, handler: WebhookHandler):
+        self.host = host
+        self.port = port
+        self._handler = handler
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def start(self):
+        """启动服务"""
+        if self._runner:
+            return
+        app = web.Application()
+        app.router.add_post("/webhook/{provider}", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except Exception:
+            await runner.cleanup()
+            raise
+        self._runner = runner
+
+    async def stop(self):
+        """停止服务"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        provider = request.match_info["provider"].lower()
+        body = await request.read()
+        status = await self._handler(provider, request.headers, body)
+        return web.Response(status=status)